@@ -0,0 +1 @@
+# 여러 페이지(main.py, pages/*.py)가 함께 사용하는 공용 모듈 모음
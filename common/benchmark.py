@@ -0,0 +1,201 @@
+"""모든 페이지를 AppTest로 헤드리스 실행하는 성능 벤치마크와 기준값 비교.
+
+페이지마다 새 파이썬 프로세스에서 네트워크 없이(가짜 주가 공급자, 임시 캐시 파일) 다음을 측정합니다.
+잡음을 줄이기 위해 새 프로세스 여러 개(--runs)에서 측정하고 지표별 중앙값을 씁니다.
+
+- cold_run_s: 첫 실행 시간 (빈 캐시)
+- rerun_s: 입력을 바꾸지 않은 재실행 시간의 중앙값
+- widget_s: 위젯 값을 바꾼 뒤 재실행 시간의 중앙값
+- peak_rss_mb: 프로세스 최대 상주 메모리
+- payload_bytes / largest_element_bytes: 화면 요소(프로토콜 버퍼)의 직렬화 크기 합과 가장 큰 요소
+
+    python -m common.benchmark                            # 측정 후 기준값과 비교 (회귀가 있으면 종료 코드 1)
+    python -m common.benchmark --update-baseline          # 현재 결과를 기준값으로 저장
+    python -m common.benchmark pages/02_stock.py --threshold 0.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from common.startup_profile import ROOT, default_pages, isolated_env
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+# 시간 지표는 이 값(초)보다 적게 늘어나면 잡음으로 보고 회귀로 치지 않습니다.
+# 100ms 미만의 재실행 시간은 프로세스마다 수십 ms씩 흔들리므로 비율만으로는 판단하지 않습니다.
+MIN_TIME_REGRESSION_S = 0.05
+# 페이지마다 측정할 새 프로세스 수 (지표별 중앙값을 씀)
+DEFAULT_RUNS = 3
+# 지표별로 작을수록 좋은 값들이며, 기준값 대비 threshold 비율보다 커지면 회귀입니다.
+METRICS = ["cold_run_s", "rerun_s", "widget_s", "peak_rss_mb", "payload_bytes"]
+
+# 페이지별 위젯 변경 시나리오: (요소 종류, 레이블, 번갈아 넣을 값들)
+# 값이 모두 다르면 매번 캐시에 없는 입력이 되어 실제 계산 시간을 잽니다.
+WIDGET_SCENARIOS = {
+    "main.py": ("selectbox", "관광지를 선택하세요:", ["몽생미셸 (Mont Saint-Michel)", "에펠탑 (Eiffel Tower)"]),
+    "pages/00_france.py": ("selectbox", "관광지를 선택하세요:", ["몽생미셸 (Mont Saint-Michel)", "에펠탑 (Eiffel Tower)"]),
+    "pages/01_geopark.py": ("selectbox", "지질공원을 선택하세요:", ["부산", "한탄강", "제주특별자치도"]),
+    "pages/02_stock.py": ("selectbox", "다운샘플링", ["LTTB", "min/max"]),
+    "pages/03_exoplanet.py": ("slider", "행성 반경 (지구 반경 단위)", [1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0]),
+}
+
+# 자식 프로세스에서 실행할 코드. 결과 JSON 한 줄을 표준 출력 마지막 줄에 씁니다.
+_CHILD = """
+import json, resource, statistics, sys, time
+from streamlit.testing.v1 import AppTest
+
+def timed(at):
+    start = time.perf_counter()
+    at.run()
+    return time.perf_counter() - start
+
+def leaves(node):
+    children = getattr(node, "children", None)
+    if children:
+        for child in children.values():
+            yield from leaves(child)
+    else:
+        yield node
+
+at = AppTest.from_file({page!r}, default_timeout={timeout})
+cold = timed(at)
+reruns = [timed(at) for _ in range({repeat})]
+widget_times = []
+scenario = {scenario!r}
+if scenario:
+    kind, label, values = scenario
+    for i in range({repeat}):
+        widget = next(w for w in getattr(at, kind) if w.label == label)
+        widget.set_value(values[i % len(values)])
+        widget_times.append(timed(at))
+
+sizes = []
+for node in leaves(at._tree):
+    proto = getattr(node, "proto", None)
+    if proto is not None and hasattr(proto, "ByteSize"):
+        sizes.append((proto.ByteSize(), getattr(node, "type", type(node).__name__)))
+largest = max(sizes, default=(0, None))
+print(json.dumps({{
+    "cold_run_s": cold,
+    "rerun_s": statistics.median(reruns),
+    "widget_s": statistics.median(widget_times) if widget_times else None,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "payload_bytes": sum(size for size, _ in sizes),
+    "largest_element_bytes": largest[0],
+    "largest_element_type": largest[1],
+    "exceptions": [str(e.value) for e in at.exception],
+}}))
+"""
+
+
+def run_page(page, repeat=5, runs=DEFAULT_RUNS, timeout=300):
+    """page를 runs개의 새 프로세스에서 측정하고 지표별 중앙값을 반환합니다."""
+    samples = [_run_page_once(page, repeat, timeout) for _ in range(runs)]
+    measured = [sample for sample in samples if not sample.get("error")]
+    if not measured:
+        return samples[0]
+    result = dict(measured[0])
+    for metric in METRICS:
+        values = [sample[metric] for sample in measured if sample.get(metric) is not None]
+        result[metric] = statistics.median(values) if values else None
+    result["exceptions"] = next((sample["exceptions"] for sample in measured if sample.get("exceptions")), [])
+    return result
+
+
+def _run_page_once(page, repeat, timeout):
+    relative = os.path.relpath(os.path.abspath(page), ROOT)
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        # 네트워크·공유 캐시 없이 매번 같은 조건에서 실행합니다.
+        code = _CHILD.format(page=os.path.abspath(page), timeout=timeout, repeat=repeat,
+                             scenario=WIDGET_SCENARIOS.get(relative))
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT,
+                              env=isolated_env(tmp), timeout=timeout * (2 * repeat + 1))
+    result = {"page": relative}
+    try:
+        result.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+    except (IndexError, ValueError):
+        result["error"] = "\n".join(proc.stderr.splitlines()[-5:])
+    return result
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """기준값보다 threshold 비율 넘게 나빠진 (페이지, 지표, 기준값, 현재값) 목록을 반환합니다."""
+    regressions = []
+    for result in results:
+        base = baseline.get(result["page"])
+        if not base:
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and not (metric.endswith("_s") and new - old < MIN_TIME_REGRESSION_S):
+                regressions.append((result["page"], metric, old, new))
+    return regressions
+
+
+def format_results(results, baseline=None):
+    baseline = baseline or {}
+    lines = [f"{'페이지':<24}" + "".join(f"{m:>16}" for m in METRICS)]
+    for result in results:
+        if result.get("error"):
+            lines.append(f"{result['page']:<24}  오류: {result['error']}")
+            continue
+        cells = []
+        for metric in METRICS:
+            value, old = result.get(metric), baseline.get(result["page"], {}).get(metric)
+            text = "-" if value is None else (f"{value:,.0f}" if metric == "payload_bytes" else f"{value:.3f}")
+            if value is not None and old:
+                text += f" ({(value / old - 1) * 100:+.0f}%)"
+            cells.append(f"{text:>16}")
+        lines.append(f"{result['page']:<24}" + "".join(cells))
+        if result.get("exceptions"):
+            lines.append(f"  예외: {result['exceptions']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="페이지 성능 벤치마크를 실행하고 기준값과 비교합니다.")
+    parser.add_argument("pages", nargs="*", help="측정할 페이지 (기본값: main.py와 pages/*.py 전부)")
+    parser.add_argument("--repeat", type=int, default=5, help="재실행·위젯 변경 반복 횟수")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="페이지마다 측정할 새 프로세스 수 (중앙값 사용)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="기준값 JSON 경로")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="회귀로 볼 증가 비율 (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="현재 결과를 기준값으로 저장")
+    parser.add_argument("--output", help="결과를 저장할 JSON 경로")
+    args = parser.parse_args(argv)
+
+    results = [run_page(page, repeat=args.repeat, runs=args.runs) for page in (args.pages or default_pages())]
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_results(results, baseline))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.update_baseline:
+        # 일부 페이지만 측정했으면 나머지 페이지의 기준값은 그대로 둡니다.
+        baseline.update({r["page"]: {m: r.get(m) for m in METRICS} for r in results if not r.get("error")})
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"기준값을 {args.baseline}에 저장했습니다.")
+        return 0
+
+    failed = [r["page"] for r in results if r.get("error") or r.get("exceptions")]
+    regressions = compare(results, baseline, args.threshold)
+    for page, metric, old, new in regressions:
+        print(f"회귀: {page} {metric} {old:.4g} → {new:.4g} (허용 +{args.threshold:.0%})")
+    for page in failed:
+        print(f"실패: {page}")
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
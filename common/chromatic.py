@@ -0,0 +1,53 @@
+"""항성 온도로부터 파장별(색깔별) 주연 감광 세기 분포와 식현상 광도 곡선을 계산합니다.
+
+회색 대기(Eddington 근사, T⁴(τ) = ¾ T_eff⁴ (τ + ⅔))에서 파장별 플랑크 함수를 광학 깊이에 대해 적분해
+I_λ(μ)를 구하고, 항성 원반을 동심 고리로 나눠 행성이 가리는 고리별 넓이와 곱합니다.
+(파장 × 시간) 광도 곡선 전체가 행렬 곱 한 번으로 계산됩니다.
+"""
+import numpy as np
+
+from common.transit import overlap_fraction
+
+H = 6.62607015e-34   # 플랑크 상수 (J·s)
+C = 2.99792458e8     # 빛의 속도 (m/s)
+K_B = 1.380649e-23   # 볼츠만 상수 (J/K)
+
+
+def planck(wavelength_m, temperature_k):
+    # 분광 복사 휘도 B_λ(T) (W·sr⁻¹·m⁻³). 지수가 매우 클 때의 overflow를 피하려고 expm1을 씁니다.
+    x = H * C / (np.asarray(wavelength_m) * K_B * np.asarray(temperature_k))
+    return 2 * H * C**2 / np.asarray(wavelength_m) ** 5 / np.expm1(np.minimum(x, 700.0))
+
+
+def limb_darkening_profiles(wavelengths_m, teff_k, mu, quadrature_points=32):
+    """(파장, μ) 모양의 방출 세기 I_λ(μ)를 반환합니다.
+
+    I_λ(μ) = ∫ B_λ(T(τ)) e^{-τ/μ} dτ/μ 를 τ = μ s 로 바꿔 가우스-라게르 구적으로 계산합니다.
+    """
+    s, weights = np.polynomial.laguerre.laggauss(quadrature_points)
+    tau = np.asarray(mu)[:, None] * s[None, :]                       # (μ, s)
+    temperature = (0.75 * teff_k**4 * (tau + 2.0 / 3.0)) ** 0.25      # (μ, s)
+    radiance = planck(np.asarray(wavelengths_m)[:, None, None], temperature[None, :, :])  # (λ, μ, s)
+    return radiance @ weights
+
+
+def chromatic_light_curves(star_radius_km, planet_radius_km, distances_km, wavelengths_m, teff_k, n_rings=64):
+    """(파장, 시간) 모양의 상대 밝기를 반환합니다.
+
+    항성 원반을 n_rings개의 동심 고리로 나누고, 각 고리 안에서 행성이 가리는 넓이(고리 × 시간)와
+    고리의 파장별 세기(파장 × 고리)를 곱해 가려진 빛의 비율을 구합니다.
+    """
+    edges = np.linspace(0.0, star_radius_km, n_rings + 1)
+    mid = 0.5 * (edges[:-1] + edges[1:])
+    mu = np.sqrt(np.clip(1.0 - (mid / star_radius_km) ** 2, 0.0, 1.0))
+    intensity = limb_darkening_profiles(wavelengths_m, teff_k, mu)    # (λ, 고리)
+
+    # 반지름 r인 원과 행성 원반의 겹침 넓이 A(r, d). 고리별 가림 넓이는 A(r_바깥) - A(r_안쪽)
+    d = np.abs(np.asarray(distances_km, dtype=np.float64))[None, :]
+    r = edges[1:, None]
+    inside = overlap_fraction(r, planet_radius_km, d) * np.pi * r**2  # (고리, 시간)
+    ring_blocked = np.diff(np.vstack([np.zeros((1, d.shape[1])), inside]), axis=0)
+
+    ring_area = np.pi * np.diff(edges**2)
+    total = intensity @ ring_area                                     # (λ,)
+    return 1.0 - (intensity @ ring_blocked) / total[:, None]
@@ -0,0 +1,33 @@
+"""페이지에서 고를 수 있는 서버 데이터 파일 목록.
+
+페이지는 임의의 서버 경로를 입력받지 않고, 허용된 데이터 디렉터리(기본: 저장소의 data/, 환경 변수 APP_DATA_DIR로 변경)
+바로 아래의 파일만 이름으로 고르게 합니다. 이름은 실제 경로로 풀어 디렉터리 밖을 가리키지 않는지 다시 확인합니다.
+"""
+import os
+
+DATA_FILES_DIR = os.environ.get(
+    "APP_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"),
+)
+
+
+def list_data_files(extensions, contains="", directory=DATA_FILES_DIR):
+    """directory 바로 아래에서 확장자가 extensions 중 하나이고 이름에 contains가 들어간 파일 이름 목록."""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted(
+        name for name in names
+        if name.lower().endswith(tuple(extensions)) and contains in name.lower()
+        and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def resolve_data_file(name, directory=DATA_FILES_DIR):
+    """파일 이름을 허용된 디렉터리 안의 실제 경로로 바꿉니다. 디렉터리 밖이거나 없는 파일이면 ValueError."""
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.dirname(path) != root or not os.path.isfile(path):
+        raise ValueError(f"허용된 데이터 파일이 아닙니다: {name}")
+    return path
@@ -0,0 +1,78 @@
+"""Plotly로 보내기 전에 시계열 점 개수를 줄이는 서버 측 다운샘플링.
+
+- minmax_indices: 구간(bucket)마다 최솟값·최댓값 위치를 남기며, (날짜 × 기업) 행렬 전체를 한 번에 처리합니다.
+- lttb_indices: Largest-Triangle-Three-Buckets. 한 시계열의 시각적 모양을 가장 잘 보존합니다.
+
+두 방법 모두 원본 점의 위치(인덱스)만 고르므로, 남은 점의 hover 값은 원본과 같습니다.
+"""
+import numpy as np
+
+# 전체 점 개수가 이 값을 넘으면 SVG(go.Scatter) 대신 WebGL(go.Scattergl)로 그립니다.
+WEBGL_POINT_THRESHOLD = 20_000
+
+
+def max_points_for_width(width_px, points_per_pixel=2):
+    # 한 픽셀에 그려지는 점이 points_per_pixel개를 넘으면 눈으로 구분되지 않습니다.
+    return max(4, int(width_px * points_per_pixel))
+
+
+def minmax_indices(matrix, max_points):
+    """각 열에서 남길 행 인덱스 배열 목록을 반환합니다. NaN(거래 없음) 구간은 건너뜁니다."""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    n_rows, n_cols = matrix.shape
+    if n_rows <= max_points:
+        return [np.flatnonzero(~np.isnan(matrix[:, j])) for j in range(n_cols)]
+
+    # 첫 점과 마지막 점을 위해 2칸을 남기고, 구간마다 최솟값·최댓값 2개씩 고릅니다.
+    n_buckets = max(1, (max_points - 2) // 2)
+    size = -(-n_rows // n_buckets)
+    padded = np.full((n_buckets * size, n_cols), np.nan)
+    padded[:n_rows] = matrix
+    blocks = padded.reshape(n_buckets, size, n_cols)
+
+    missing = np.isnan(blocks)
+    offsets = np.arange(n_buckets)[:, None] * size
+    mins = np.where(missing, np.inf, blocks).argmin(axis=1) + offsets
+    maxs = np.where(missing, -np.inf, blocks).argmax(axis=1) + offsets
+    empty = missing.all(axis=1)
+
+    indices = []
+    for j in range(n_cols):
+        valid = np.flatnonzero(~np.isnan(matrix[:, j]))
+        if valid.size == 0:
+            indices.append(valid)
+            continue
+        keep = ~empty[:, j]
+        picked = np.concatenate([mins[keep, j], maxs[keep, j], valid[[0, -1]]])
+        indices.append(np.unique(picked))
+    return indices
+
+
+def lttb_indices(y, max_points, x=None):
+    """한 시계열에 대해 LTTB로 남길 인덱스를 반환합니다. x를 생략하면 등간격으로 봅니다."""
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = valid.size
+    if n <= max_points or max_points < 3:
+        return valid
+    xs = (np.arange(len(y), dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64))[valid]
+    ys = y[valid]
+
+    # 첫 점과 마지막 점을 제외한 구간을 (max_points - 2)개 bucket으로 나눕니다.
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # 다음 bucket의 평균점 (마지막 bucket에서는 마지막 점)
+        nxt_start, nxt_end = end, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = xs[nxt_start:nxt_end].mean()
+        avg_y = ys[nxt_start:nxt_end].mean()
+        # 이전 선택점, 후보점, 다음 평균점이 이루는 삼각형 넓이가 가장 큰 점을 고릅니다.
+        area = np.abs(
+            (xs[a] - avg_x) * (ys[start:end] - ys[a]) - (xs[a] - xs[start:end]) * (avg_y - ys[a])
+        )
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return valid[selected]
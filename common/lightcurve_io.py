@@ -0,0 +1,164 @@
+"""관측 광도 곡선(수백만 행)의 분할 읽기, 위상 접기·구간 평균, 반경비 적합.
+
+파일 전체를 메모리에 올리지 않도록 표를 일정 행 수씩 읽으면서 위상을 접고, 고정된 개수의 위상 구간에
+합계·제곱합·개수만 누적합니다. 적합은 구간 평균된 데이터에 대해 반경비 후보들의 χ²를 프로세스 풀에서 나눠 계산합니다.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from common.transit import overlap_fraction
+
+DEFAULT_CHUNK_ROWS = 500_000
+
+
+# --- 1. 분할 읽기 ---
+def iter_table_chunks(source, time_col, flux_col, chunk_rows=DEFAULT_CHUNK_ROWS, fmt=None):
+    """(time, flux) 배열 쌍을 chunk_rows행씩 내보냅니다.
+
+    source는 파일 경로나 파일 객체이며, fmt는 "csv"(구분자 자동 감지), "fits" 중 하나입니다.
+    생략하면 파일 이름의 확장자로 판단합니다. FITS를 읽으려면 astropy가 필요합니다.
+    """
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    fmt = fmt or ("fits" if name.lower().endswith((".fits", ".fit", ".fits.gz")) else "csv")
+    if fmt == "fits":
+        yield from _iter_fits_chunks(source, time_col, flux_col, chunk_rows)
+        return
+
+    # pandas는 관측 광도 곡선을 읽을 때만 필요하므로 여기서 가져옵니다.
+    import pandas as pd
+
+    reader = pd.read_csv(
+        source, usecols=[time_col, flux_col], chunksize=chunk_rows, comment="#", **_csv_options(name),
+    )
+    for chunk in reader:
+        yield chunk[time_col].to_numpy(dtype=np.float64), chunk[flux_col].to_numpy(dtype=np.float64)
+
+
+def _iter_fits_chunks(source, time_col, flux_col, chunk_rows):
+    try:
+        from astropy.io import fits
+    except ImportError as e:
+        raise ImportError("FITS 파일을 읽으려면 astropy를 설치하세요: pip install astropy") from e
+    with fits.open(source, memmap=True) as hdul:
+        table = next(hdu for hdu in hdul if isinstance(hdu, (fits.BinTableHDU, fits.TableHDU)))
+        for start in range(0, table.header["NAXIS2"], chunk_rows):
+            rows = table.data[start:start + chunk_rows]
+            yield (np.asarray(rows[time_col], dtype=np.float64),
+                   np.asarray(rows[flux_col], dtype=np.float64))
+
+
+def _csv_options(name):
+    # 쉼표 외의 구분자(탭, 공백)를 쓰는 표는 구분자를 자동으로 감지합니다.
+    if name.lower().endswith((".tsv", ".tbl", ".dat", ".txt")):
+        return {"sep": None, "engine": "python"}
+    return {"sep": ",", "engine": "c"}
+
+
+def peek_columns(source):
+    # 업로드된 표의 열 이름만 읽습니다. 구분자는 iter_table_chunks와 같은 규칙으로 정합니다. (파일 위치는 처음으로 되돌림)
+    import pandas as pd
+
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    columns = list(pd.read_csv(source, nrows=0, comment="#", **_csv_options(name)).columns)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return columns
+
+
+# --- 2. 위상 접기 · 구간 평균 ---
+class PhaseBinner:
+    # 위상 -0.5 ~ 0.5 (식현상 중심 = 0)를 n_bins개의 구간으로 나눠 누적합니다.
+    def __init__(self, period, epoch, n_bins=500):
+        self.period = period
+        self.epoch = epoch
+        self.n_bins = n_bins
+        self.sums = np.zeros(n_bins)
+        self.sq_sums = np.zeros(n_bins)
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.rows = 0
+
+    def add(self, time, flux):
+        ok = np.isfinite(time) & np.isfinite(flux)
+        time, flux = time[ok], flux[ok]
+        phase = np.mod((time - self.epoch) / self.period + 0.5, 1.0) - 0.5
+        bins = np.minimum(((phase + 0.5) * self.n_bins).astype(np.int64), self.n_bins - 1)
+        self.sums += np.bincount(bins, weights=flux, minlength=self.n_bins)
+        self.sq_sums += np.bincount(bins, weights=flux * flux, minlength=self.n_bins)
+        self.counts += np.bincount(bins, minlength=self.n_bins)
+        self.rows += len(time)
+
+    def result(self, normalize=True):
+        """(위상 중심, 평균 밝기, 평균의 표준 오차, 개수)를 반환합니다. 빈 구간은 제외합니다."""
+        filled = self.counts > 0
+        counts = self.counts[filled]
+        mean = self.sums[filled] / counts
+        variance = np.maximum(self.sq_sums[filled] / counts - mean**2, 0.0)
+        stderr = np.sqrt(variance / np.maximum(counts - 1, 1))
+        phase = (np.arange(self.n_bins)[filled] + 0.5) / self.n_bins - 0.5
+        if normalize and mean.size:
+            # 대부분의 구간은 식현상 밖이므로 중앙값을 기준 밝기 1.0으로 맞춥니다.
+            baseline = np.median(mean)
+            mean, stderr = mean / baseline, stderr / baseline
+        # 표본이 하나뿐인 구간은 다른 구간의 대표 오차를 씁니다.
+        fallback = np.median(stderr[stderr > 0]) if (stderr > 0).any() else 1.0
+        return phase, mean, np.where(stderr > 0, stderr, fallback), counts
+
+
+def bin_light_curve(source, time_col, flux_col, period, epoch, n_bins=500, chunk_rows=DEFAULT_CHUNK_ROWS, fmt=None):
+    binner = PhaseBinner(period, epoch, n_bins)
+    for time, flux in iter_table_chunks(source, time_col, flux_col, chunk_rows, fmt):
+        binner.add(time, flux)
+    return binner
+
+
+# --- 3. 반경비 적합 ---
+def transit_model(phase, radius_ratio, a_over_rs):
+    # 페이지와 같은 기하: 항성 반경 1, 궤도 반경 a/R_s, 위상 0에서 식현상 중심
+    d = a_over_rs * np.abs(np.sin(2 * np.pi * np.asarray(phase)))
+    # 위상 ±0.25 바깥(항성 뒤쪽)은 가리지 않습니다.
+    front = np.abs(phase) < 0.25
+    return 1.0 - np.where(front, overlap_fraction(1.0, radius_ratio, d), 0.0)
+
+
+def _chi2_for_ratios(args):
+    # 프로세스 풀 작업 단위: 반경비 후보 묶음의 χ²를 한 번의 브로드캐스팅으로 계산
+    phase, flux, err, a_over_rs, ratios = args
+    model = transit_model(phase[None, :], ratios[:, None], a_over_rs)
+    return (((flux - model) / err) ** 2).sum(axis=1)
+
+
+# 모델 평가 횟수(후보 수 × 위상 구간 수)가 이보다 적으면 프로세스 시작 비용이 더 크므로 바로 계산합니다.
+MIN_PARALLEL_EVALUATIONS = 2_000_000
+
+
+def _chi2_grid(phase, flux, err, a_over_rs, ratios, max_workers):
+    if max_workers <= 1 or len(ratios) * len(phase) < MIN_PARALLEL_EVALUATIONS:
+        return _chi2_for_ratios((phase, flux, err, a_over_rs, ratios))
+    chunks = np.array_split(ratios, max_workers)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        parts = pool.map(_chi2_for_ratios, [(phase, flux, err, a_over_rs, c) for c in chunks])
+        return np.concatenate(list(parts))
+
+
+def fit_radius_ratio(phase, flux, err, a_over_rs, k_min=0.001, k_max=0.5, n_grid=400, refine_rounds=2,
+                     max_workers=None):
+    """구간 평균된 위상 곡선에 대해 χ²가 최소인 반경비 k = R_p / R_s를 찾습니다.
+
+    넓은 격자에서 후보를 평가한 뒤 최솟값 주변을 더 촘촘한 격자로 refine_rounds번 좁혀 갑니다.
+    반환값: (k, 최소 χ², 축소 χ², (평가한 k 배열, χ² 배열))
+    """
+    max_workers = max_workers or min(4, os.cpu_count() or 1)
+    phase, flux, err = (np.asarray(a, dtype=np.float64) for a in (phase, flux, err))
+    ratios = np.linspace(k_min, k_max, n_grid)
+    chi2 = _chi2_grid(phase, flux, err, a_over_rs, ratios, max_workers)
+    coarse = (ratios, chi2)
+    for _ in range(refine_rounds):
+        best = int(np.argmin(chi2))
+        step = ratios[1] - ratios[0]
+        ratios = np.linspace(max(k_min, ratios[best] - step), min(k_max, ratios[best] + step), n_grid // 4)
+        chi2 = _chi2_grid(phase, flux, err, a_over_rs, ratios, max_workers)
+    best = int(np.argmin(chi2))
+    dof = max(1, len(phase) - 1)
+    return float(ratios[best]), float(chi2[best]), float(chi2[best] / dof), coarse
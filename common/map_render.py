@@ -0,0 +1,50 @@
+"""Folium 지도 HTML 캐시와 표시 방식.
+
+st_folium은 스크립트가 실행될 때마다 지도를 다시 만들고, 이동·확대 상태를 서버로 돌려보내 재실행을 일으킵니다.
+지도 상호작용 결과를 쓰지 않는 페이지는 완성된 지도 HTML을 선택 항목별로 캐시해 두고 정적 컴포넌트로 띄웁니다.
+"""
+import contextlib
+import os
+
+from common.memo import BoundedMemo
+
+# "static": 캐시된 HTML을 components.html로 표시 (기본값)
+# "interactive": st_folium으로 표시하되 돌려받는 상호작용 값은 없음
+MAP_RENDER_MODE = os.environ.get("MAP_RENDER_MODE", "static")
+MAP_HTML_CACHE_ENTRIES = 64
+MAP_HTML_CACHE_BYTES = 128 * 1024 * 1024
+
+
+def new_map_html_cache():
+    return BoundedMemo(max_entries=MAP_HTML_CACHE_ENTRIES, max_bytes=MAP_HTML_CACHE_BYTES)
+
+
+def render_map_html(m):
+    # iframe 안에서 그대로 열 수 있는 완성된 HTML 문서
+    return m.get_root().render()
+
+
+def show_map(build_map, key, cache, width, height, mode=None, trace=None):
+    """key에 해당하는 지도를 표시합니다. build_map은 folium.Map을 만드는 인자 없는 함수입니다.
+
+    정적 모드에서는 캐시에 HTML이 있으면 지도를 만들지 않으므로, key에는 지도 모양을 바꾸는 값을 모두 넣어야 합니다.
+    trace(common.tracing.RunTrace)를 주면 지도를 새로 만든 경우 그 시간을 build_map 구간으로 기록합니다.
+    """
+    if (mode or MAP_RENDER_MODE) == "interactive":
+        from streamlit_folium import st_folium
+        with _span(trace, "build_map"):
+            m = build_map()
+        return st_folium(m, width=width, height=height, returned_objects=[])
+
+    import streamlit.components.v1 as components
+
+    def build_html():
+        with _span(trace, "build_map"):
+            return render_map_html(build_map())
+
+    html = cache.get_or_compute(key, build_html)
+    components.html(html, width=width, height=height)
+
+
+def _span(trace, name):
+    return trace.span(name) if trace is not None else contextlib.nullcontext()
@@ -0,0 +1,169 @@
+"""주가·발행 주식수 데이터 소스와 여러 티커를 동시에 가져오는 수집 단계.
+
+데이터 소스(provider)는 info(ticker), shares_outstanding(ticker), history(ticker, start, end)
+세 메서드만 제공하면 되므로, 네트워크 없이 테스트할 때는 FakeProvider로 바꿔 쓸 수 있습니다.
+"""
+import functools
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait, TimeoutError as FuturesTimeout
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT_SECONDS = 20
+# 완료·시간 초과를 확인하는 간격(초)
+_POLL_SECONDS = 0.1
+
+# elapsed: 티커 하나를 가져오는 데 걸린 시간(초). 시간 초과로 끝난 티커는 None
+FetchResult = namedtuple("FetchResult", ["ticker", "shares_outstanding", "history", "error", "elapsed"],
+                         defaults=(None,))
+
+
+# --- 1. 데이터 소스 ---
+class YFinanceProvider:
+    def __init__(self, timeout=DEFAULT_TIMEOUT_SECONDS):
+        self.timeout = timeout
+
+    def info(self, ticker):
+        import yfinance as yf
+        return _call_with_timeout(lambda: yf.Ticker(ticker).info, self.timeout)
+
+    def shares_outstanding(self, ticker):
+        return self.info(ticker).get("sharesOutstanding", None)
+
+    def history(self, ticker, start, end):
+        import yfinance as yf
+        return yf.Ticker(ticker).history(start=start, end=end, timeout=self.timeout)
+
+
+def _call_with_timeout(fn, timeout):
+    # yfinance의 .info에는 요청 시간 제한 인자가 없으므로 별도 스레드에서 실행하고 timeout까지만 기다립니다.
+    # 응답이 없는 요청은 그 스레드에 남지만, 수집 작업 스레드는 곧바로 풀로 돌아갑니다.
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        return executor.submit(fn).result(timeout=timeout)
+    except FuturesTimeout:
+        raise TimeoutError(f"Request timed out after {timeout}s") from None
+    finally:
+        executor.shutdown(wait=False)
+
+
+class FakeProvider:
+    # 티커 이름으로 시드를 고정한 무작위 보행 주가를 돌려주는 오프라인 데이터 소스
+    def __init__(self, base_price=100.0, shares=5_000_000_000, fail=()):
+        self.base_price = base_price
+        self.shares = shares
+        self.fail = set(fail)
+
+    def _rng(self, ticker):
+        return np.random.default_rng(sum(ord(c) * 31 ** i for i, c in enumerate(ticker)) % (2 ** 32))
+
+    def info(self, ticker):
+        if ticker in self.fail:
+            return {}
+        return {"sharesOutstanding": int(self.shares * (0.5 + self._rng(ticker).random())), "longName": ticker}
+
+    def shares_outstanding(self, ticker):
+        return self.info(ticker).get("sharesOutstanding", None)
+
+    def history(self, ticker, start, end):
+        if ticker in self.fail:
+            return pd.DataFrame({"Close": []})
+        # 시작일과 무관하게 같은 날짜에는 같은 가격이 나오도록 고정된 기준일부터 생성합니다.
+        dates = _fake_business_days(pd.Timestamp(end).tz_localize(None).normalize() - pd.Timedelta(days=1))
+        steps = self._rng(ticker).normal(0.0004, 0.018, len(dates))
+        close = self.base_price * np.exp(np.cumsum(steps))
+        first = dates.searchsorted(pd.Timestamp(start).tz_localize(None).normalize())
+        return pd.DataFrame({"Close": close[first:]}, index=dates[first:])
+
+
+@functools.lru_cache(maxsize=8)
+def _fake_business_days(last_day):
+    # 2000년부터의 영업일 인덱스는 만드는 데 시간이 걸리므로 마지막 날짜별로 프로세스당 한 번만 만듭니다.
+    return pd.bdate_range(pd.Timestamp("2000-01-03"), last_day)
+
+
+def get_provider(name=None):
+    # STOCK_DATA_PROVIDER=fake 로 실행하면 네트워크 없이 가짜 데이터로 동작합니다.
+    name = name or os.environ.get("STOCK_DATA_PROVIDER", "yfinance")
+    if name == "fake":
+        return FakeProvider()
+    return YFinanceProvider()
+
+
+# --- 2. 동시 수집 ---
+def _fetch_one(provider, ticker, start, end, price_store):
+    started = time.perf_counter()
+    try:
+        shares = provider.shares_outstanding(ticker)
+        if shares is None:
+            # 예외가 아닌 '데이터 없음'은 error 없이 shares_outstanding=None 으로 돌려줍니다.
+            return FetchResult(ticker, None, None, None, time.perf_counter() - started)
+        if price_store is not None:
+            hist = price_store.load_history(
+                ticker, start, end, fetch=lambda s, e: provider.history(ticker, s, e)
+            )
+        else:
+            hist = provider.history(ticker, start, end)
+        return FetchResult(ticker, shares, hist, None, time.perf_counter() - started)
+    except Exception as e:
+        return FetchResult(ticker, None, None, str(e), time.perf_counter() - started)
+
+
+def _run(started, provider, ticker, start, end, price_store):
+    # 작업이 실제로 시작한 시각을 남겨, 풀 대기열에서 기다린 시간은 티커별 제한 시간에 넣지 않습니다.
+    started[ticker] = time.monotonic()
+    return _fetch_one(provider, ticker, start, end, price_store)
+
+
+def fetch_all(tickers, start, end, provider=None, price_store=None,
+              max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT_SECONDS, on_progress=None):
+    """모든 티커의 발행 주식수와 주가를 제한된 스레드 풀에서 동시에 가져옵니다.
+
+    timeout은 티커 하나에 대한 제한 시간(초)으로, 작업이 시작된 뒤 이 시간이 지나면 기다리지 않고 실패로 처리합니다.
+    on_progress(done, total, ticker)는 호출한 스레드(Streamlit 메인 스레드)에서 호출됩니다.
+    반환값은 입력 순서를 유지한 {ticker: FetchResult} 딕셔너리입니다.
+    """
+    provider = provider or get_provider()
+    tickers = list(tickers)
+    results = {}
+    started = {}
+    workers = max(1, min(max_workers, len(tickers)))
+
+    def finish(ticker, result):
+        results[ticker] = result
+        if on_progress is not None:
+            on_progress(len(results), len(tickers), ticker)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            executor.submit(_run, started, provider, ticker, start, end, price_store): ticker
+            for ticker in tickers
+        }
+        # 작업 스레드가 모두 응답 없는 요청에 묶이면 대기 중인 티커는 시작하지 못하므로,
+        # 전체 묶음에도 (티커당 timeout × 차례 수)의 상한을 둡니다.
+        batch_deadline = time.monotonic() + timeout * max(1, -(-len(tickers) // workers))
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(futures[future], future.result())
+            now = time.monotonic()
+            expired = [
+                f for f in pending
+                if now - started.get(futures[f], now) > timeout or now > batch_deadline
+            ]
+            for future in expired:
+                pending.discard(future)
+                future.cancel()
+                ticker = futures[future]
+                finish(ticker, FetchResult(ticker, None, None, f"Timed out after {timeout}s"))
+    finally:
+        # 시간 초과된 요청은 기다리지 않습니다.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return {ticker: results[ticker] for ticker in tickers}
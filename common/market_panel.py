@@ -0,0 +1,68 @@
+"""티커 유니버스 로딩과 시가총액 패널(날짜 × 기업) 구성.
+
+DataFrame에 열을 하나씩 추가하면 매번 인덱스 정렬이 일어나므로, 모든 티커의 거래일을
+하나의 인덱스로 합친 뒤 미리 할당한 float32 행렬을 채우고 마지막에 한 번만 DataFrame으로 감쌉니다.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_UNIVERSE_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "sp500_universe.csv"
+)
+TRILLION = 1_000_000_000_000
+# 주가 페이지가 보여주는 기간(일). 대략 3년
+HISTORY_DAYS = 3 * 365
+
+# 현재(2025년 6월) 대략적인 글로벌 시총 상위 기업 티커 목록
+# 이 목록은 실제와 다를 수 있으며, 주기적으로 업데이트해야 합니다.
+TOP_TICKERS = {
+    "AAPL": "Apple",
+    "MSFT": "Microsoft",
+    "NVDA": "NVIDIA",
+    "GOOGL": "Alphabet", # Google
+    "AMZN": "Amazon",
+    "META": "Meta Platforms",
+    "TSM": "TSMC",
+    "LLY": "Eli Lilly",
+    "JPM": "JPMorgan Chase & Co.", # 금융 기업 추가
+    "XOM": "Exxon Mobil" # 에너지 기업 추가
+}
+# 참고: Saudi Aramco (2222.SR)는 yfinance에서 접근이 어려울 수 있습니다.
+# Tesla는 시총 변동성이 커서 Top10에 들지 않을 수 있어 다른 기업으로 대체
+
+
+def load_universe(path=DEFAULT_UNIVERSE_CSV):
+    # ticker,name 두 열을 가진 CSV를 {티커: 기업명} 딕셔너리로 읽습니다. (중복 티커는 첫 항목 유지)
+    universe = pd.read_csv(path, dtype=str).dropna(subset=["ticker"])
+    universe = universe.drop_duplicates(subset="ticker")
+    names = universe["name"].fillna(universe["ticker"])
+    return dict(zip(universe["ticker"].str.strip(), names.str.strip()))
+
+
+def _day_index(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+def build_market_cap_panel(series, scale=TRILLION, dtype=np.float32):
+    """{기업명: (종가 DataFrame, 발행 주식수)}로부터 시가총액 패널을 만듭니다.
+
+    반환값은 통합 거래일 인덱스와 기업명 열을 가진 DataFrame이며, 값의 단위는 scale(기본: 조 달러)입니다.
+    해당 날짜에 거래가 없던 칸은 NaN입니다.
+    """
+    names = list(series.keys())
+    day_indices = [_day_index(hist.index) for hist, _ in series.values()]
+    if not day_indices:
+        return pd.DataFrame()
+
+    dates = np.unique(np.concatenate([idx.values for idx in day_indices]))
+    matrix = np.full((len(dates), len(names)), np.nan, dtype=dtype)
+    for j, ((hist, shares), idx) in enumerate(zip(series.values(), day_indices)):
+        rows = np.searchsorted(dates, idx.values)
+        matrix[rows, j] = hist["Close"].to_numpy(dtype=np.float64) * (shares / scale)
+
+    return pd.DataFrame(matrix, index=pd.DatetimeIndex(dates, name="Date"), columns=names)
@@ -0,0 +1,67 @@
+"""메모리 상한이 있는 LRU 메모이제이션.
+
+슬라이더 값 조합처럼 사용자가 자주 되돌아가는 키에 대해 계산된 배열이나 figure를 보관하고,
+항목 수나 추정 메모리 사용량이 상한을 넘으면 가장 오래 쓰이지 않은 항목부터 버립니다.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+
+def estimate_size(value):
+    # NumPy 배열은 버퍼 크기, 컨테이너는 원소 크기의 합으로 대략 추정합니다.
+    # (지도 페이지가 numpy를 불러오지 않도록 isinstance 대신 nbytes 속성으로 배열을 알아봅니다.)
+    if isinstance(getattr(value, "nbytes", None), int):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class BoundedMemo:
+    def __init__(self, max_entries=64, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get_or_compute(self, key, compute, sizeof=estimate_size):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._entries[key][0]
+            self._stats["misses"] += 1
+
+        # 계산은 잠금 밖에서 합니다. (같은 키를 동시에 계산하면 나중 결과로 덮어씀)
+        value = compute()
+        size = sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+                self._stats["evictions"] += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), bytes=self._bytes,
+                         max_entries=self.max_entries, max_bytes=self.max_bytes)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,132 @@
+"""티커 `.info` 필드를 프로세스 전체에서 공유하는 TTL + LRU 캐시.
+
+유효 기간(TTL)이 지난 값도 바로 돌려주고(stale-while-revalidate), 새 값은 백그라운드
+스레드에서 받아 교체합니다. 발행 주식수처럼 분기에 한 번 바뀌는 값은 TTL을 길게 둡니다.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+DAY = 24 * 60 * 60
+# 필드별 TTL(초). 여기에 없는 필드는 default_ttl을 씁니다.
+DEFAULT_FIELD_TTLS = {
+    "sharesOutstanding": 7 * DAY,
+    "longName": 30 * DAY,
+    "marketCap": 60 * 60,
+}
+_MISSING = object()
+
+
+class MetadataCache:
+    def __init__(self, fetch_info, field_ttls=None, default_ttl=DAY, negative_ttl=10 * 60,
+                 max_entries=4096, refresh_workers=4, store=None):
+        # fetch_info(ticker)는 yfinance의 Ticker.info처럼 필드 딕셔너리를 돌려주는 함수입니다.
+        # store(PriceStore)를 주면 받아온 값을 디스크에도 기록하고, 메모리에 없을 때 디스크에서 먼저 찾습니다.
+        self.fetch_info = fetch_info
+        self.store = store
+        self.field_ttls = dict(DEFAULT_FIELD_TTLS if field_ttls is None else field_ttls)
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (ticker, field) -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="metadata-refresh")
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0, "evictions": 0}
+
+    def _ttl(self, field, value):
+        if value is None:
+            return self.negative_ttl
+        return self.field_ttls.get(field, self.default_ttl)
+
+    def _store(self, ticker, info, fields, fetched_at=None, persist=True):
+        # 요청한 필드와 TTL이 설정된 필드를 함께 저장해 같은 티커의 다음 조회를 줄입니다.
+        now = time.time() if fetched_at is None else fetched_at
+        values = {field: info.get(field) for field in set(fields) | (set(self.field_ttls) & set(info))}
+        with self._lock:
+            for field, value in values.items():
+                self._entries[(ticker, field)] = (value, now + self._ttl(field, value))
+                self._entries.move_to_end((ticker, field))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        if persist and self.store is not None:
+            # '값 없음'은 재시도할 수 있도록 메모리에만 잠깐 둡니다.
+            self.store.write_info(ticker, {f: v for f, v in values.items() if v is not None}, fetched_at=now)
+
+    def _load_persisted(self, ticker, field):
+        # 디스크(예: 사전 적재 작업이 기록한 값)에서 값을 찾아 메모리에 올립니다.
+        if self.store is None:
+            return False
+        record = self.store.read_info(ticker, field)
+        if record is None:
+            return False
+        value, fetched_at = record
+        self._store(ticker, {field: value}, [field], fetched_at=fetched_at, persist=False)
+        return True
+
+    def _refresh(self, ticker, field):
+        try:
+            self._store(ticker, self.fetch_info(ticker) or {}, [field])
+            with self._lock:
+                self._stats["refreshes"] += 1
+        except Exception:
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(ticker)
+
+    def get(self, ticker, field):
+        with self._lock:
+            in_memory = (ticker, field) in self._entries
+        if not in_memory:
+            self._load_persisted(ticker, field)
+
+        with self._lock:
+            value, expires_at = self._entries.get((ticker, field), (_MISSING, 0.0))
+            if value is not _MISSING:
+                self._entries.move_to_end((ticker, field))
+                if time.time() < expires_at:
+                    self._stats["hits"] += 1
+                    return value
+                # 만료된 값은 그대로 돌려주고, 같은 티커에 대한 갱신은 한 번만 예약합니다.
+                self._stats["stale_hits"] += 1
+                if ticker not in self._refreshing:
+                    self._refreshing.add(ticker)
+                    self._executor.submit(self._refresh, ticker, field)
+                return value
+            self._stats["misses"] += 1
+
+        info = self.fetch_info(ticker) or {}
+        self._store(ticker, info, [field])
+        return info.get(field)
+
+    def invalidate(self, ticker=None):
+        with self._lock:
+            for key in [k for k in self._entries if ticker is None or k[0] == ticker]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries), max_entries=self.max_entries)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+class MetadataCachingProvider:
+    # 데이터 소스를 감싸 shares_outstanding 조회를 MetadataCache로 돌리는 래퍼
+    def __init__(self, provider, cache):
+        self.provider = provider
+        self.cache = cache
+
+    def info(self, ticker):
+        return self.provider.info(ticker)
+
+    def shares_outstanding(self, ticker):
+        return self.cache.get(ticker, "sharesOutstanding")
+
+    def history(self, ticker, start, end):
+        return self.provider.history(ticker, start, end)
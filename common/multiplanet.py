@@ -0,0 +1,88 @@
+"""여러 행성이 케플러 궤도를 도는 계의 합성 광도 곡선.
+
+모든 행성 × 모든 시각의 케플러 방정식을 배열 한 번에 풀고(뉴턴 반복), 하늘 평면에 투영한 위치로
+각 행성의 가림 넓이를 구해 합칩니다. 두 행성이 동시에 항성 앞에서 서로 겹치면 겹친 넓이를 한 번만 뺍니다.
+"""
+import numpy as np
+
+from common.transit import overlap_fraction
+
+R_EARTH_KM = 6371
+AU_KM = 149597870.7
+PLANET_COLUMNS = ["이름", "반경 (R⊕)", "궤도 장반경 (AU)", "이심률", "궤도 경사각 (°)", "초기 위상 (°)"]
+
+
+def default_planet_table(num_planets=10, seed=7):
+    # 식현상이 잘 보이도록 경사각 90° 근처, 짧은 궤도의 예시 행성계를 만듭니다.
+    import pandas as pd  # 다중 행성 모드를 켤 때만 필요하므로 여기서 가져옵니다.
+
+    rng = np.random.default_rng(seed)
+    semi_major = np.round(np.sort(rng.uniform(0.02, 0.25, num_planets)), 4)
+    return pd.DataFrame({
+        "이름": [f"행성 {chr(ord('b') + i)}" for i in range(num_planets)],
+        "반경 (R⊕)": np.round(rng.uniform(0.5, 12.0, num_planets), 2),
+        "궤도 장반경 (AU)": semi_major,
+        "이심률": np.round(rng.uniform(0.0, 0.2, num_planets), 3),
+        "궤도 경사각 (°)": np.round(rng.uniform(89.0, 90.0, num_planets), 2),
+        "초기 위상 (°)": np.round(rng.uniform(0, 360, num_planets), 1),
+    }, columns=PLANET_COLUMNS)
+
+
+def orbital_periods_days(semi_major_au, star_mass_sun):
+    # 케플러 제3법칙: P[년]^2 = a[AU]^3 / M[태양 질량]
+    return 365.25 * np.sqrt(np.asarray(semi_major_au, dtype=np.float64) ** 3 / star_mass_sun)
+
+
+def solve_kepler(mean_anomaly, eccentricity, iterations=8):
+    """E - e sin E = M 을 모든 원소에 대해 동시에 뉴턴 반복으로 풉니다. (e < 1)"""
+    M, e = np.broadcast_arrays(np.mod(mean_anomaly, 2 * np.pi), np.asarray(eccentricity, dtype=np.float64))
+    E = np.where(e < 0.8, M, np.pi)
+    for _ in range(iterations):
+        E = E - (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+    return E
+
+
+def sky_positions(times_days, semi_major_km, eccentricity, inclination_deg, phase_deg, periods_days,
+                  periastron_deg=90.0):
+    """(행성, 시각) 모양의 하늘 평면 좌표 x, y와 시선 방향 z(+는 관측자 쪽)를 반환합니다."""
+    a = np.asarray(semi_major_km, dtype=np.float64)[:, None]
+    e = np.asarray(eccentricity, dtype=np.float64)[:, None]
+    inc = np.radians(np.asarray(inclination_deg, dtype=np.float64))[:, None]
+    mean_anomaly = (2 * np.pi * np.asarray(times_days, dtype=np.float64)[None, :] / np.asarray(periods_days)[:, None]
+                    + np.radians(np.asarray(phase_deg, dtype=np.float64))[:, None])
+
+    E = solve_kepler(mean_anomaly, e)
+    true_anomaly = 2 * np.arctan2(np.sqrt(1 + e) * np.sin(E / 2), np.sqrt(1 - e) * np.cos(E / 2))
+    r = a * (1 - e * np.cos(E))
+    angle = true_anomaly + np.radians(periastron_deg)
+    x = r * np.cos(angle)
+    y = r * np.sin(angle) * np.cos(inc)
+    z = r * np.sin(angle) * np.sin(inc)
+    return x, y, z
+
+
+def multi_planet_flux(star_radius_km, planet_radii_km, x, y, z):
+    """(행성, 시각) 위치 배열로부터 합성 상대 밝기와 행성별 가림 비율을 계산합니다.
+
+    행성끼리 겹친 넓이는 두 행성이 모두 항성 앞에 있을 때 한 번만 빼며, 겹친 부분이 항성 원반 안에
+    있다고 보는 근사입니다.
+    """
+    R_p = np.asarray(planet_radii_km, dtype=np.float64)[:, None]
+    in_front = z > 0
+    blocked = np.where(in_front, overlap_fraction(star_radius_km, R_p, np.hypot(x, y)), 0.0)
+    total = blocked.sum(axis=0)
+
+    # 두 행성 이상이 동시에 항성을 가리는 시각만 골라 행성 쌍의 겹침을 계산합니다.
+    shared = np.flatnonzero((blocked > 0).sum(axis=0) >= 2)
+    i, j = np.triu_indices(len(R_p), k=1)
+    if i.size and shared.size:
+        xs, ys, on_star = x[:, shared], y[:, shared], blocked[:, shared] > 0
+        pair_d = np.hypot(xs[i] - xs[j], ys[i] - ys[j])
+        near = on_star[i] & on_star[j] & (pair_d < R_p[i] + R_p[j])
+        if near.any():
+            # 두 행성 원반의 겹침 넓이를 항성 면적으로 나눠 밝기 비율로 바꿉니다.
+            big = np.maximum(R_p[i], R_p[j])
+            small = np.minimum(R_p[i], R_p[j])
+            pair_area = np.where(near, overlap_fraction(big, small, pair_d) * big**2, 0.0)
+            total[shared] -= pair_area.sum(axis=0) / star_radius_km**2
+    return 1.0 - np.clip(total, 0.0, 1.0), blocked
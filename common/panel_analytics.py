@@ -0,0 +1,191 @@
+"""시가총액 패널(날짜 × 기업) 전체에 대한 벡터화 분석: 일간 수익률, 이동 변동성, 낙폭, 상관행렬.
+
+PanelAnalytics는 계산에 필요한 누적량을 들고 있다가, 같은 기업 구성의 패널이 새 봉만큼 늘어나면
+새 행만 더하고(앞쪽 기간이 밀려나면 그만큼 빼고) 3년 전체를 다시 계산하지 않습니다.
+
+- 이동 변동성: 수익률과 수익률 제곱의 누적합(prefix sum)으로 어떤 창 길이든 O(날짜 × 기업)에 구합니다.
+- 상관행렬: 쌍별 유효 개수·합·제곱합·곱의 합 행렬을 누적해 두고, 결측(NaN)이 있는 쌍은 함께 관측된 날만 씁니다.
+- 낙폭: 새 봉은 직전까지의 최고점에 이어 붙이고, 기간 시작이 바뀌면 최고점부터 다시 계산합니다.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+DEFAULT_VOLATILITY_WINDOWS = (20, 60, 120)
+
+
+class PanelAnalytics:
+    def __init__(self):
+        self.dates = None
+        self.columns = None
+        self.values = None  # (T, N) float64 시가총액
+        self.returns = None  # (T, N) 일간 수익률, 첫 행과 결측 칸은 NaN
+        self._source = None  # 마지막으로 반영한 패널 객체 (같은 객체면 비교 없이 건너뜀)
+        # 갱신과 조회가 여러 세션 스레드에서 동시에 오므로 조회도 같은 잠금 안에서 합니다. (summary가 다른 조회를 부르므로 재진입 가능)
+        self._lock = threading.RLock()
+        self.full_rebuilds = 0
+        self.incremental_updates = 0
+
+    # --- 갱신 ---
+    def update(self, panel):
+        """패널을 반영하고 "full"/"append"/"unchanged" 중 어떻게 갱신했는지 반환합니다."""
+        with self._lock:
+            if panel is self._source:
+                return "unchanged"
+            self._source = panel
+            columns = [str(c) for c in panel.columns]
+            values = panel.to_numpy(dtype=np.float64)
+            dates = pd.DatetimeIndex(panel.index)
+            if self.dates is None or columns != self.columns:
+                self._rebuild(dates, columns, values)
+                return "full"
+
+            # 새 패널의 첫 날짜가 기존 기간 안에 있고, 겹치는 구간의 날짜·값이 같으면 차이만 반영합니다.
+            drop = self.dates.searchsorted(dates[0]) if len(dates) else len(self.dates)
+            overlap = len(self.dates) - drop
+            if (
+                drop >= len(self.dates)
+                or overlap > len(dates)
+                or not dates[:overlap].equals(self.dates[drop:])
+                or not np.array_equal(values[:overlap], self.values[drop:], equal_nan=True)
+            ):
+                self._rebuild(dates, columns, values)
+                return "full"
+            if drop == 0 and overlap == len(dates):
+                return "unchanged"
+
+            if drop:
+                self._drop_front(drop)
+            if len(dates) > overlap:
+                self._append(dates[overlap:], values[overlap:])
+            self.incremental_updates += 1
+            return "append"
+
+    def _rebuild(self, dates, columns, values):
+        self.dates, self.columns = dates, columns
+        self.values = values
+        self.returns = _returns(values, previous=None)
+        n = len(columns)
+        self._prefix = _prefix_sums(self.returns)
+        self._pair = [np.zeros((n, n)) for _ in range(4)]  # 쌍별 개수, Σx, Σx², Σxy
+        _add_pair_sums(self._pair, self.returns, sign=1)
+        self._peak = np.fmax.accumulate(values, axis=0)
+        self.full_rebuilds += 1
+
+    def _append(self, dates, values):
+        new_returns = _returns(values, previous=self.values[-1])
+        last = [p[-1] for p in self._prefix]
+        self._prefix = [np.vstack([p, s + l]) for p, s, l in zip(self._prefix, _prefix_sums(new_returns, leading_zero=False), last)]
+        _add_pair_sums(self._pair, new_returns, sign=1)
+        peak = np.fmax.accumulate(np.vstack([self._peak[-1:], values]), axis=0)[1:]
+        self.dates = self.dates.append(dates)
+        self.values = np.vstack([self.values, values])
+        self.returns = np.vstack([self.returns, new_returns])
+        self._peak = np.vstack([self._peak, peak])
+
+    def _drop_front(self, k):
+        # 밀려나는 k개 행과, 새 첫 행의 수익률(직전 값이 사라져 NaN이 됨)을 누적량에서 뺍니다.
+        _add_pair_sums(self._pair, self.returns[:k + 1], sign=-1)
+        self.dates = self.dates[k:]
+        self.values = self.values[k:]
+        self.returns = self.returns[k:].copy()
+        self.returns[0] = np.nan
+        # 누적합은 k+1번째 행 기준으로 다시 영점을 맞추면 되므로 누적을 다시 하지 않습니다.
+        self._prefix = [p[k:] - p[k + 1] for p in self._prefix]
+        for p in self._prefix:
+            p[0] = 0.0
+        # 최고점은 새 기간 시작부터 다시 잽니다. (낙폭의 기준이 바뀌므로)
+        self._peak = np.fmax.accumulate(self.values, axis=0)
+
+    # --- 조회 ---
+    def returns_frame(self):
+        with self._lock:
+            return pd.DataFrame(self.returns, index=self.dates, columns=self.columns)
+
+    def rolling_volatility(self, window, annualize=True, min_periods=None):
+        """창 길이 window(거래일)의 이동 표준편차. 창 안의 유효 수익률이 min_periods보다 적으면 NaN."""
+        with self._lock:
+            count, total, squares = self._prefix
+            window = int(window)
+            min_periods = max(2, window // 2 if min_periods is None else min_periods)
+            lag = np.maximum(np.arange(1, len(self.dates) + 1) - window, 0)
+            n = count[1:] - count[lag]
+            s = total[1:] - total[lag]
+            s2 = squares[1:] - squares[lag]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                var = (s2 - s * s / n) / (n - 1)
+            vol = np.sqrt(np.clip(var, 0.0, None))
+            vol[n < min_periods] = np.nan
+            if annualize:
+                vol *= np.sqrt(TRADING_DAYS_PER_YEAR)
+            return pd.DataFrame(vol, index=self.dates, columns=self.columns)
+
+    def drawdown(self):
+        # 각 날짜의 (값 / 기간 내 직전 최고점 - 1)
+        with self._lock:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return pd.DataFrame(self.values / self._peak - 1.0, index=self.dates, columns=self.columns)
+
+    def max_drawdown(self):
+        # fmin은 NaN을 건너뛰므로, 값이 하나도 없는 기업만 NaN이 됩니다.
+        with self._lock:
+            worst = np.fmin.reduce(self.drawdown().to_numpy(), axis=0)
+            return pd.Series(worst, index=self.columns, name="max_drawdown")
+
+    def correlation(self, min_periods=20):
+        """함께 관측된 날의 수익률로 구한 쌍별 피어슨 상관계수 행렬."""
+        with self._lock:
+            n, sx, sxx, sxy = self._pair[:4]
+            sy, syy = sx.T, sxx.T
+            with np.errstate(invalid="ignore", divide="ignore"):
+                corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+            corr[n < min_periods] = np.nan
+            np.clip(corr, -1.0, 1.0, out=corr)
+            np.fill_diagonal(corr, np.where(np.diag(n) >= min_periods, 1.0, np.nan))
+            return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def summary(self, windows=DEFAULT_VOLATILITY_WINDOWS):
+        # 기업별 최근 값 표: 마지막 일간 수익률, 창별 연율화 변동성, 최대 낙폭
+        with self._lock:
+            table = {"일간 수익률": _last_valid(self.returns)}
+            for window in windows:
+                table[f"변동성 {window}일"] = _last_valid(self.rolling_volatility(window).to_numpy())
+            table["최대 낙폭"] = self.max_drawdown().to_numpy()
+            return pd.DataFrame(table, index=self.columns)
+
+
+def _returns(values, previous):
+    # previous가 있으면 새 봉의 첫 행 수익률을 이전 마지막 값 기준으로 구합니다.
+    base = np.vstack([np.full((1, values.shape[1]), np.nan) if previous is None else previous[None, :], values])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return base[1:] / base[:-1] - 1.0
+
+
+def _prefix_sums(returns, leading_zero=True):
+    # (유효 개수, 합, 제곱합)의 누적합. leading_zero면 맨 앞에 0 행을 붙여 길이 T+1로 만듭니다.
+    valid = ~np.isnan(returns)
+    filled = np.where(valid, returns, 0.0)
+    sums = [np.cumsum(valid, axis=0, dtype=np.float64), np.cumsum(filled, axis=0), np.cumsum(filled * filled, axis=0)]
+    if leading_zero:
+        sums = [np.vstack([np.zeros((1, returns.shape[1])), s]) for s in sums]
+    return sums
+
+
+def _add_pair_sums(pair, returns, sign):
+    # 쌍 (i, j)에 대해 둘 다 유효한 날만 세는 행렬곱: 개수, Σx_i, Σx_i², Σx_i·x_j
+    valid = (~np.isnan(returns)).astype(np.float64)
+    filled = np.where(valid > 0, returns, 0.0)
+    pair[0] += sign * (valid.T @ valid)
+    pair[1] += sign * (filled.T @ valid)
+    pair[2] += sign * ((filled * filled).T @ valid)
+    pair[3] += sign * (filled.T @ filled)
+
+
+def _last_valid(matrix):
+    # 열마다 마지막 유효 값 (없으면 NaN)
+    valid = ~np.isnan(matrix)
+    rows = np.where(valid.any(axis=0), matrix.shape[0] - 1 - np.argmax(valid[::-1], axis=0), 0)
+    last = matrix[rows, np.arange(matrix.shape[1])]
+    return np.where(valid.any(axis=0), last, np.nan)
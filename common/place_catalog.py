@@ -0,0 +1,236 @@
+"""여러 페이지가 함께 쓰는 관광지·지질공원 카탈로그와 전문 검색.
+
+카탈로그 원본은 data/ 아래의 CSV/GeoJSON 파일이고, 처음 쓸 때 로컬 SQLite 파일로 옮겨 FTS5 색인을 만듭니다.
+색인은 trigram 토크나이저를 써서 띄어쓰기·형태소 분석 없이 한국어 부분 문자열(접두어 포함)을 찾을 수 있습니다.
+원본 파일의 수정 시각이나 크기가 바뀌면 해당 묶음(collection)만 다시 색인합니다.
+"""
+import csv
+import json
+import math
+import os
+import sqlite3
+from contextlib import contextmanager
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+DEFAULT_GEOPARK_CATALOG = os.path.join(DATA_DIR, "geoparks.csv")
+CATALOG_COLUMNS = ["name", "lat", "lon", "url", "feature", "tour"]
+# CSV의 tour 열은 여러 코스를 이 구분자로 이어 씁니다.
+TOUR_SEPARATOR = " | "
+
+# 기본 저장 위치: 저장소 루트의 .cache/catalog.sqlite (환경 변수로 변경 가능)
+DEFAULT_CATALOG_DB = os.environ.get(
+    "CATALOG_DB_PATH",
+    os.path.join(os.path.dirname(DATA_DIR), ".cache", "catalog.sqlite"),
+)
+DEFAULT_SOURCES = {
+    "france": os.environ.get("FRANCE_CATALOG_PATH", os.path.join(DATA_DIR, "france_spots.csv")),
+    "geoparks": os.environ.get("GEOPARK_CATALOG_PATH", DEFAULT_GEOPARK_CATALOG),
+}
+# trigram 색인은 세 글자 이상인 검색어만 찾을 수 있으므로, 더 짧은 검색어는 LIKE로 찾습니다.
+TRIGRAM_MIN_LENGTH = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    id          INTEGER PRIMARY KEY,
+    collection  TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    lat         REAL NOT NULL,
+    lon         REAL NOT NULL,
+    url         TEXT,
+    description TEXT,
+    feature     TEXT,
+    tour        TEXT
+);
+CREATE INDEX IF NOT EXISTS places_collection_name ON places (collection, name);
+CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5(
+    name, description, feature, tour, tokenize = 'trigram'
+);
+CREATE TABLE IF NOT EXISTS sources (
+    collection TEXT PRIMARY KEY,
+    path       TEXT NOT NULL,
+    mtime      REAL NOT NULL,
+    size       INTEGER NOT NULL,
+    rows       INTEGER NOT NULL
+);
+"""
+
+
+def iter_catalog_rows(path):
+    """카탈로그 파일의 행을 정리된 딕셔너리(name, lat, lon, url, description, feature, tour 목록)로 내보냅니다."""
+    rows = _iter_geojson_rows(path) if path.lower().endswith((".geojson", ".json")) else _iter_csv_rows(path)
+    count = 0
+    for row in rows:
+        try:
+            lat, lon = float(row["lat"]), float(row["lon"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not (math.isfinite(lat) and math.isfinite(lon)):
+            continue
+        count += 1
+        tour = row.get("tour") or []
+        if isinstance(tour, str):
+            tour = [t.strip() for t in tour.split(TOUR_SEPARATOR.strip()) if t.strip()]
+        yield {
+            "name": str(row.get("name") or f"지점 {count}"),
+            "lat": lat,
+            "lon": lon,
+            "url": row.get("url") or "",
+            "description": row.get("description") or "",
+            "feature": row.get("feature") or "",
+            "tour": list(tour),
+        }
+
+
+def _iter_csv_rows(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def _iter_geojson_rows(path):
+    with open(path, encoding="utf-8") as f:
+        collection = json.load(f)
+    for feature in collection.get("features", []):
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") != "Point":
+            continue
+        # GeoJSON 좌표 순서는 [경도, 위도]
+        lon, lat = geometry["coordinates"][:2]
+        yield dict(feature.get("properties") or {}, lat=lat, lon=lon)
+
+
+class PlaceCatalog:
+    def __init__(self, path=DEFAULT_CATALOG_DB, sources=None):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        for collection, source in (DEFAULT_SOURCES if sources is None else sources).items():
+            self.sync_collection(collection, source)
+
+    @contextmanager
+    def _connect(self):
+        # 스레드마다 별도 연결을 쓰도록 호출 시점에 연결을 열고, 끝나면 커밋 후 닫습니다.
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # --- 색인 ---
+    def sync_collection(self, collection, source_path):
+        """원본 파일이 마지막 색인 이후 바뀌었으면 묶음을 다시 색인합니다. 다시 색인했으면 True."""
+        stat = os.stat(source_path)
+        signature = (os.path.abspath(source_path), stat.st_mtime, stat.st_size)
+        with self._connect() as conn:
+            if self._signature(conn, collection) == signature:
+                return False
+            # 여러 프로세스가 동시에 색인하지 않도록 쓰기 잠금을 잡은 뒤 다시 확인합니다.
+            conn.execute("BEGIN IMMEDIATE")
+            if self._signature(conn, collection) == signature:
+                return False
+            conn.execute(
+                "DELETE FROM places_fts WHERE rowid IN (SELECT id FROM places WHERE collection = ?)", (collection,)
+            )
+            conn.execute("DELETE FROM places WHERE collection = ?", (collection,))
+            rows = [
+                (collection, r["name"], r["lat"], r["lon"], r["url"], r["description"], r["feature"],
+                 json.dumps(r["tour"], ensure_ascii=False))
+                for r in iter_catalog_rows(source_path)
+            ]
+            conn.executemany(
+                "INSERT INTO places (collection, name, lat, lon, url, description, feature, tour) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            # 투어 목록은 JSON 대신 공백으로 이은 문장으로 색인합니다.
+            conn.execute(
+                "INSERT INTO places_fts (rowid, name, description, feature, tour) "
+                "SELECT p.id, p.name, p.description, p.feature, "
+                "       (SELECT group_concat(value, ' ') FROM json_each(p.tour)) "
+                "FROM places p WHERE p.collection = ?",
+                (collection,),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO sources (collection, path, mtime, size, rows) VALUES (?, ?, ?, ?, ?)",
+                (*([collection] + list(signature)), len(rows)),
+            )
+        return True
+
+    @staticmethod
+    def _signature(conn, collection):
+        row = conn.execute("SELECT path, mtime, size FROM sources WHERE collection = ?", (collection,)).fetchone()
+        return tuple(row) if row else None
+
+    # --- 조회 ---
+    def names(self, collection):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT name FROM places WHERE collection = ? ORDER BY id", (collection,)).fetchall()
+        return [name for (name,) in rows]
+
+    def get(self, collection, name):
+        # 페이지에서 쓰던 딕셔너리 형식({"location", "url", "description", "feature", "tour"})으로 돌려줍니다.
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT lat, lon, url, description, feature, tour FROM places WHERE collection = ? AND name = ? "
+                "ORDER BY id LIMIT 1",
+                (collection, name),
+            ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        lat, lon, url, description, feature, tour = row
+        return {
+            "location": [lat, lon],
+            "url": url or "",
+            "description": description or "",
+            "feature": feature or "",
+            "tour": json.loads(tour) if tour else [],
+        }
+
+    def search(self, query, collections=None, limit=20):
+        """이름·설명·특징·투어 코스에서 검색어를 모두 포함하는 장소를 찾습니다.
+
+        이름이 검색어로 시작하는 장소가 먼저 나오고, 그다음은 FTS5 bm25 점수 순입니다.
+        반환값: [{"collection", "name", "lat", "lon"}, ...]
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        long_terms = [t for t in terms if len(t) >= TRIGRAM_MIN_LENGTH]
+        short_terms = [t for t in terms if len(t) < TRIGRAM_MIN_LENGTH]
+
+        sql = "SELECT p.collection, p.name, p.lat, p.lon FROM places p"
+        where, params = [], []
+        if long_terms:
+            sql += " JOIN places_fts ON places_fts.rowid = p.id"
+            where.append("places_fts MATCH ?")
+            params.append(" AND ".join('"' + t.replace('"', '""') + '"' for t in long_terms))
+        for term in short_terms:
+            pattern = "%" + _escape_like(term) + "%"
+            where.append(
+                "(p.name LIKE ? ESCAPE '\\' OR p.description LIKE ? ESCAPE '\\' "
+                "OR p.feature LIKE ? ESCAPE '\\' OR p.tour LIKE ? ESCAPE '\\')"
+            )
+            params += [pattern] * 4
+        if collections:
+            where.append(f"p.collection IN ({', '.join('?' * len(collections))})")
+            params += list(collections)
+        sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY (p.name LIKE ? ESCAPE '\\') DESC, " + ("bm25(places_fts), " if long_terms else "") + "p.id"
+        params.append(_escape_like(terms[0]) + "%")
+        sql += " LIMIT ?"
+        params.append(int(limit))
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [{"collection": c, "name": n, "lat": lat, "lon": lon} for c, n, lat, lon in rows]
+
+    def stats(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT collection, path, rows FROM sources ORDER BY collection").fetchall()
+        return {collection: {"path": path, "rows": count} for collection, path, count in rows}
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,192 @@
+"""지질공원·지질명소 카탈로그(CSV/GeoJSON) 읽기와 지도용 클러스터 레이어.
+
+지점마다 folium.Marker와 HTML 팝업을 만들면 지점 수만큼 파이썬 객체와 HTML이 생기므로, 수만 개의 지점은
+좌표와 짧은 속성만 담은 배열 하나로 브라우저에 보내고 Leaflet.markercluster가 클라이언트에서 묶어 그립니다.
+팝업 내용은 마커를 눌렀을 때 처음 만들어집니다.
+"""
+import csv
+import functools
+import json
+
+import numpy as np
+
+from common.place_catalog import CATALOG_COLUMNS, DEFAULT_GEOPARK_CATALOG, TOUR_SEPARATOR, iter_catalog_rows
+
+
+class PoiCatalog:
+    # 열 단위로 보관합니다. coords는 (지점 수, 2) 모양의 [위도, 경도] 배열
+    def __init__(self, names, coords, urls, features, tours):
+        self.names = list(names)
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.urls = list(urls)
+        self.features = list(features)
+        self.tours = list(tours)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self._rows_json = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def get(self, name):
+        # 기존 페이지의 딕셔너리 형식({"location", "url", "feature", "tour"})으로 돌려줍니다.
+        i = self._index[name]
+        return {
+            "location": self.coords[i].tolist(),
+            "url": self.urls[i],
+            "feature": self.features[i],
+            "tour": self.tours[i],
+        }
+
+    def marker_rows_json(self, include_features=True):
+        """클러스터 레이어에 넣을 지점별 JSON 행([위도, 경도, 이름, url, 설명])을 한 번만 만들어 둡니다."""
+        if include_features not in self._rows_json:
+            rows = []
+            for lat, lon, name, url, feature in zip(self.coords[:, 0].tolist(), self.coords[:, 1].tolist(),
+                                                    self.names, self.urls, self.features):
+                row = [lat, lon, name, url, feature if include_features else ""]
+                # 비어 있는 뒤쪽 속성은 보내지 않습니다. (자바스크립트에서 undefined로 처리)
+                while len(row) > 3 and not row[-1]:
+                    row.pop()
+                rows.append(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+            self._rows_json[include_features] = rows
+        return self._rows_json[include_features]
+
+    def concat(self, other):
+        return PoiCatalog(
+            self.names + other.names, np.vstack([self.coords, other.coords]),
+            self.urls + other.urls, self.features + other.features, self.tours + other.tours,
+        )
+
+
+def load_poi_catalog(path):
+    """CSV(name, lat, lon, url, feature, tour) 또는 Point 지오메트리의 GeoJSON을 읽습니다.
+
+    url, description, feature, tour 열은 없어도 되며, 좌표가 비었거나 숫자가 아닌 행은 건너뜁니다.
+    """
+    names, coords, urls, features, tours = [], [], [], [], []
+    for row in iter_catalog_rows(path):
+        names.append(row["name"])
+        coords.append((row["lat"], row["lon"]))
+        urls.append(row["url"])
+        features.append(row["feature"])
+        tours.append(row["tour"])
+    return PoiCatalog(names, np.array(coords, dtype=np.float64).reshape(-1, 2), urls, features, tours)
+
+
+# 마커를 누를 때 팝업 DOM을 만듭니다. 툴팁·팝업 모두 문자열을 HTML로 끼워 넣지 않고 textContent로 넣어
+# 이스케이프 문제를 피하며, 링크는 http(s) 주소만 겁니다.
+LAZY_POPUP_CALLBACK = """function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    var label = document.createElement("span");
+    label.textContent = row[2];
+    marker.bindTooltip(label);
+    marker.bindPopup(function () {
+        var box = document.createElement("div");
+        var title = document.createElement("b");
+        title.textContent = row[2];
+        box.appendChild(title);
+        if (/^https?:\\/\\//i.test(row[3])) {
+            var link = document.createElement("a");
+            link.href = row[3];
+            link.target = "_blank";
+            link.textContent = "홈페이지";
+            box.appendChild(document.createElement("br"));
+            box.appendChild(link);
+        }
+        if (row[4]) {
+            var note = document.createElement("i");
+            note.textContent = row[4];
+            box.appendChild(document.createElement("br"));
+            box.appendChild(note);
+        }
+        return box;
+    }, {maxWidth: 320});
+    return marker;
+}"""
+
+
+def cluster_layer(catalog, name="지질명소", exclude=(), include_features=True):
+    """카탈로그 전체를 클러스터 레이어 하나로 만듭니다.
+
+    include_features=False면 설명 문장을 빼서 지점이 아주 많을 때 지도 HTML 크기를 줄입니다.
+    """
+    rows = catalog.marker_rows_json(include_features)
+    if exclude:
+        exclude = set(exclude)
+        rows = [row for name, row in zip(catalog.names, rows) if name not in exclude]
+    # </script> 조기 종료를 막기 위해 "</"를 이스케이프합니다.
+    data_json = ("[" + ",".join(rows) + "]").replace("</", "<\\/")
+    return _compact_cluster_class()(data_json, callback=LAZY_POPUP_CALLBACK, name=name, chunkedLoading=True)
+
+
+# FastMarkerCluster 템플릿과 같되, 데이터 부분만 미리 직렬화한 문자열을 그대로 넣습니다.
+COMPACT_CLUSTER_TEMPLATE = """
+{% macro script(this, kwargs) %}
+    var {{ this.get_name() }} = (function(){
+        {{ this.callback }}
+
+        var data = {{ this.data_json }};
+        var cluster = L.markerClusterGroup({{ this.options|tojavascript }});
+        for (var i = 0; i < data.length; i++) {
+            callback(data[i]).addTo(cluster);
+        }
+
+        cluster.addTo({{ this._parent.get_name() }});
+        return cluster;
+    })();
+{% endmacro %}"""
+
+
+@functools.lru_cache(maxsize=None)
+def _compact_cluster_class():
+    # folium은 지도를 그릴 때만 필요하므로 처음 쓸 때 가져옵니다.
+    from folium.plugins import FastMarkerCluster
+    from folium.template import Template
+
+    class CompactMarkerCluster(FastMarkerCluster):
+        # FastMarkerCluster는 그릴 때마다 행마다 좌표를 검증하고 한글을 \uXXXX로 직렬화하므로,
+        # 카탈로그에서 미리 만든 공백 없는 UTF-8 JSON을 그대로 넣습니다.
+        _template = Template(COMPACT_CLUSTER_TEMPLATE)
+
+        def __init__(self, data_json, **kwargs):
+            super().__init__([], **kwargs)
+            self.data_json = data_json
+
+    return CompactMarkerCluster
+
+
+def synthetic_catalog(num_sites, seed=0, bounds=((33.0, 38.6), (124.5, 131.0))):
+    # 부하 시험용: 한반도 남쪽 범위 안에 무작위 지질명소를 만듭니다.
+    rng = np.random.default_rng(seed)
+    (lat_min, lat_max), (lon_min, lon_max) = bounds
+    coords = np.column_stack([rng.uniform(lat_min, lat_max, num_sites), rng.uniform(lon_min, lon_max, num_sites)])
+    names = [f"지질명소 {i + 1:06d}" for i in range(num_sites)]
+    return PoiCatalog(names, np.round(coords, 5), [""] * num_sites, [""] * num_sites, [[] for _ in range(num_sites)])
+
+
+def write_csv(catalog, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(CATALOG_COLUMNS)
+        for i, (lat, lon) in enumerate(catalog.coords.tolist()):
+            writer.writerow([catalog.names[i], lat, lon, catalog.urls[i], catalog.features[i],
+                             TOUR_SEPARATOR.join(catalog.tours[i])])
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="부하 시험용 지질명소 카탈로그 CSV를 만듭니다.")
+    parser.add_argument("output", help="저장할 CSV 경로")
+    parser.add_argument("--sites", type=int, default=100_000, help="지점 수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    write_csv(synthetic_catalog(args.sites, args.seed), args.output)
+    print(f"{args.sites:,}개 지점을 {args.output}에 저장했습니다.")
+
+
+if __name__ == "__main__":
+    main()
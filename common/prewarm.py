@@ -0,0 +1,192 @@
+"""주가 페이지가 읽는 캐시(주가·메타데이터)를 미리 채워 두는 사전 적재(prewarm) 작업.
+
+cron 형식 일정에 맞춰 같은 SQLite 저장소에 기록하므로, 장 마감 후 첫 사용자도 캐시된 데이터를 바로 봅니다.
+
+    # 평일 16:30(서버 시각)마다 최대 10분의 지터를 두고 실행
+    python -m common.prewarm --schedule "30 16 * * 1-5" --jitter 600
+    # 한 번만 실행 (유니버스 CSV 전체)
+    python -m common.prewarm --once --universe data/sp500_universe.csv
+
+페이지 프로세스 안에서 돌리려면 start_background_prewarmer()를 한 번 호출합니다.
+"""
+import argparse
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from common.market_data import fetch_all, get_provider
+from common.market_panel import HISTORY_DAYS, TOP_TICKERS, load_universe
+from common.metadata_cache import MetadataCache, MetadataCachingProvider
+from common.price_store import PriceStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCHEDULE = "30 16 * * 1-5"
+
+
+# --- 1. cron 형식 일정 ---
+def _parse_cron_field(field, low, high):
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/")
+            step = int(step)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-"))
+        else:
+            start = end = int(part)
+        if start < low or end > high:
+            raise ValueError(f"cron 값 범위를 벗어났습니다: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    # "분 시 일 월 요일" 5개 필드를 지원합니다. 요일은 0=일요일 ... 6=토요일 (7도 일요일)
+    # 일과 요일이 모두 지정되면(둘 다 *로 시작하지 않으면) 표준 cron처럼 둘 중 하나만 맞아도 실행합니다.
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 식은 5개 필드가 필요합니다: {expression!r}")
+        self.expression = expression
+        self.minutes = sorted(_parse_cron_field(fields[0], 0, 59))
+        self.hours = sorted(_parse_cron_field(fields[1], 0, 23))
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in _parse_cron_field(fields[4], 0, 7)}
+        self.day_or_weekday = not fields[2].startswith("*") and not fields[4].startswith("*")
+
+    def matches_day(self, day):
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        return (in_days or in_weekdays) if self.day_or_weekday else (in_days and in_weekdays)
+
+    def matches(self, moment):
+        return moment.minute in self.minutes and moment.hour in self.hours and self.matches_day(moment)
+
+    def next_after(self, moment):
+        # 분 단위로 훑지 않고, 일치하는 날짜를 찾은 뒤 그날의 첫 (시, 분)을 고릅니다.
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # 2월 29일 같은 일정도 찾도록 최대 8년(윤년이 건너뛰는 세기 포함)까지 봅니다.
+        for offset in range(8 * 366):
+            day = start + timedelta(days=offset)
+            if not self.matches_day(day):
+                continue
+            earliest = (start.hour, start.minute) if offset == 0 else (0, 0)
+            for hour in self.hours:
+                for minute in self.minutes:
+                    if (hour, minute) >= earliest:
+                        return day.replace(hour=hour, minute=minute)
+        raise ValueError(f"실행 시각을 찾을 수 없습니다: {self.expression!r}")
+
+
+# --- 2. 사전 적재 실행 ---
+def prewarm(tickers, store, provider=None, retries=3, backoff_seconds=30.0, sleep=time.sleep):
+    """티커 목록의 주가와 발행 주식수를 저장소에 채웁니다. 실패한 티커는 지수 백오프로 재시도합니다."""
+    base_provider = provider or get_provider()
+    # 페이지와 같은 저장소에 메타데이터를 기록하도록 캐시를 통해 조회합니다.
+    cached_provider = MetadataCachingProvider(base_provider, MetadataCache(base_provider.info, store=store))
+    started_at = time.time()
+    pending = list(tickers)
+    failed = []
+    try:
+        for attempt in range(retries + 1):
+            end = datetime.now()
+            start = end - timedelta(days=HISTORY_DAYS)
+            results = fetch_all(pending, start, end, provider=cached_provider, price_store=store)
+            failed = [t for t, r in results.items()
+                      if r.error is not None or r.shares_outstanding is None or r.history is None or r.history.empty]
+            if not failed or attempt == retries:
+                break
+            delay = backoff_seconds * (2 ** attempt) * (1 + random.random() * 0.1)
+            logger.warning("prewarm: %d개 티커 실패, %.0f초 후 재시도 (%d/%d)", len(failed), delay, attempt + 1, retries)
+            sleep(delay)
+            pending = failed
+        store.record_prewarm(started_at, time.time(), len(tickers) - len(failed), failed)
+    except Exception as e:
+        store.record_prewarm(started_at, time.time(), 0, list(tickers), error=str(e))
+        raise
+    return failed
+
+
+def run_scheduler(tickers, store, schedule=DEFAULT_SCHEDULE, jitter_seconds=300, provider=None,
+                  stop_event=None, run_immediately=False):
+    schedule = CronSchedule(schedule) if isinstance(schedule, str) else schedule
+    stop_event = stop_event or threading.Event()
+    if run_immediately:
+        _safe_prewarm(tickers, store, provider)
+    while not stop_event.is_set():
+        # 여러 프로세스가 같은 시각에 몰리지 않도록 무작위 지터를 더합니다.
+        next_run = schedule.next_after(datetime.now()) + timedelta(seconds=random.uniform(0, jitter_seconds))
+        logger.info("prewarm: 다음 실행 %s", next_run.isoformat(timespec="seconds"))
+        if stop_event.wait(max(0.0, (next_run - datetime.now()).total_seconds())):
+            break
+        _safe_prewarm(tickers, store, provider)
+
+
+def _safe_prewarm(tickers, store, provider):
+    try:
+        failed = prewarm(tickers, store, provider)
+        logger.info("prewarm: 완료 (실패 %d개)", len(failed))
+    except Exception:
+        logger.exception("prewarm: 실행 중 오류")
+
+
+_background_lock = threading.Lock()
+_background_threads = {}
+
+
+def start_background_prewarmer(tickers, store, schedule=DEFAULT_SCHEDULE, jitter_seconds=300, provider=None,
+                               name="default"):
+    # 티커 목록(name)마다 프로세스당 하나의 데몬 스레드만 띄웁니다.
+    # 세션마다 다른 유니버스를 고를 수 있으므로, 처음 들어온 세션의 목록만 적재되지 않도록 이름별로 따로 둡니다.
+    with _background_lock:
+        thread = _background_threads.get(name)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(
+                target=run_scheduler, args=(list(tickers), store, schedule, jitter_seconds, provider),
+                name=f"price-prewarmer-{name}", daemon=True,
+            )
+            thread.start()
+            _background_threads[name] = thread
+    return thread
+
+
+def prewarm_status(store, schedule=DEFAULT_SCHEDULE):
+    # 사이드바 표시용: 마지막 실행 기록과 다음 예정 시각
+    status = store.last_prewarm() or {}
+    status["next_run"] = CronSchedule(schedule).next_after(datetime.now())
+    return status
+
+
+# --- 3. 명령줄 진입점 ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="주가 페이지 캐시 사전 적재")
+    parser.add_argument("--schedule", default=DEFAULT_SCHEDULE, help='cron 식 (기본: "%(default)s")')
+    parser.add_argument("--jitter", type=float, default=300, help="실행 시각에 더할 최대 지터(초)")
+    parser.add_argument("--universe", help="ticker,name CSV 경로 (생략하면 Top 10 목록)")
+    parser.add_argument("--db", help="주가 캐시 SQLite 경로 (기본: PriceStore 기본값)")
+    parser.add_argument("--once", action="store_true", help="일정 없이 한 번만 실행")
+    parser.add_argument("--provider", help="데이터 소스 (yfinance 또는 fake)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    tickers = list(load_universe(args.universe) if args.universe else TOP_TICKERS)
+    store = PriceStore(args.db) if args.db else PriceStore()
+    provider = get_provider(args.provider)
+    if args.once:
+        failed = prewarm(tickers, store, provider)
+        return 1 if failed else 0
+    run_scheduler(tickers, store, args.schedule, args.jitter, provider)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
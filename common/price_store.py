@@ -0,0 +1,204 @@
+"""티커·날짜 단위 종가를 로컬 SQLite 파일에 보관하는 주가 캐시.
+
+처음 로딩(콜드)할 때만 전체 기간을 내려받고, 이후에는 캐시에 저장된 마지막
+날짜 이후의 봉만 추가로 가져옵니다. 네트워크가 없어도 캐시된 데이터로 동작합니다.
+"""
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# 기본 저장 위치: 저장소 루트의 .cache/prices.sqlite (환경 변수로 변경 가능)
+DEFAULT_DB_PATH = os.environ.get(
+    "PRICE_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "prices.sqlite"),
+)
+# 보존 기간(일): 이보다 오래된 봉은 정리(prune) 시 삭제됩니다.
+DEFAULT_RETENTION_DAYS = int(os.environ.get("PRICE_CACHE_RETENTION_DAYS", 4 * 365))
+# 마지막 갱신 후 이 시간(초)이 지나지 않았으면 네트워크 요청을 건너뜁니다.
+DEFAULT_MAX_AGE_SECONDS = int(os.environ.get("PRICE_CACHE_MAX_AGE_SECONDS", 60 * 60))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    ticker TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    close  REAL NOT NULL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS metadata (
+    ticker     TEXT NOT NULL,
+    field      TEXT NOT NULL,
+    value      TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (ticker, field)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS prewarm_runs (
+    started_at  REAL NOT NULL,
+    finished_at REAL,
+    ok          INTEGER,
+    failed      TEXT,
+    error       TEXT
+);
+CREATE TABLE IF NOT EXISTS fetch_log (
+    ticker       TEXT PRIMARY KEY,
+    fetched_at   REAL NOT NULL,
+    covered_from TEXT
+);
+"""
+
+
+class PriceStore:
+    def __init__(self, path=DEFAULT_DB_PATH, retention_days=DEFAULT_RETENTION_DAYS,
+                 max_age_seconds=DEFAULT_MAX_AGE_SECONDS):
+        self.path = path
+        self.retention_days = retention_days
+        self.max_age_seconds = max_age_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # 스레드마다 별도 연결을 쓰도록 호출 시점에 연결을 열고, 끝나면 커밋 후 닫습니다.
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # --- 조회 ---
+    def read(self, ticker, start=None, end=None):
+        query = "SELECT date, close FROM prices WHERE ticker = ?"
+        params = [ticker]
+        if start is not None:
+            query += " AND date >= ?"
+            params.append(_to_day(start))
+        if end is not None:
+            query += " AND date < ?"
+            params.append(_to_day(end))
+        query += " ORDER BY date"
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        index = pd.DatetimeIndex([r[0] for r in rows], name="Date")
+        return pd.DataFrame({"Close": [r[1] for r in rows]}, index=index)
+
+    def last_date(self, ticker):
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(date) FROM prices WHERE ticker = ?", (ticker,)).fetchone()
+        return None if row[0] is None else datetime.strptime(row[0], "%Y-%m-%d")
+
+    def last_fetched(self, ticker):
+        with self._connect() as conn:
+            row = conn.execute("SELECT fetched_at FROM fetch_log WHERE ticker = ?", (ticker,)).fetchone()
+        return None if row is None else row[0]
+
+    def covered_from(self, ticker):
+        # 전체 기간 요청으로 채워 둔 가장 이른 시작일 (이보다 앞선 구간을 요청하면 콜드 로딩)
+        with self._connect() as conn:
+            row = conn.execute("SELECT covered_from FROM fetch_log WHERE ticker = ?", (ticker,)).fetchone()
+        return None if row is None or row[0] is None else datetime.strptime(row[0], "%Y-%m-%d")
+
+    def tickers(self):
+        with self._connect() as conn:
+            return [r[0] for r in conn.execute("SELECT DISTINCT ticker FROM prices ORDER BY ticker")]
+
+    # --- 쓰기 ---
+    def upsert(self, ticker, hist, covered_from=None):
+        # hist: yfinance history() 결과처럼 'Close' 열과 날짜 인덱스를 가진 DataFrame
+        if hist is not None and not hist.empty:
+            days = [_to_day(ts) for ts in hist.index]
+            rows = [(ticker, day, float(close)) for day, close in zip(days, hist["Close"]) if pd.notna(close)]
+        else:
+            rows = []
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO prices (ticker, date, close) VALUES (?, ?, ?)", rows)
+            conn.execute(
+                "INSERT INTO fetch_log (ticker, fetched_at, covered_from) VALUES (?, ?, ?) "
+                "ON CONFLICT(ticker) DO UPDATE SET fetched_at = excluded.fetched_at, "
+                "covered_from = COALESCE(excluded.covered_from, fetch_log.covered_from)",
+                (ticker, time.time(), None if covered_from is None else _to_day(covered_from)),
+            )
+        return len(rows)
+
+    def invalidate(self, ticker=None):
+        # 특정 티커(또는 전체)의 캐시를 지워 다음 로딩 때 전체 기간을 다시 받도록 합니다.
+        with self._connect() as conn:
+            for table in ("prices", "fetch_log", "metadata"):
+                if ticker is None:
+                    conn.execute(f"DELETE FROM {table}")
+                else:
+                    conn.execute(f"DELETE FROM {table} WHERE ticker = ?", (ticker,))
+
+    # --- 메타데이터(.info 필드) ---
+    def read_info(self, ticker, field):
+        # (값, 받아온 시각)을 반환하며, 저장된 적이 없으면 None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, fetched_at FROM metadata WHERE ticker = ? AND field = ?", (ticker, field)
+            ).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1])
+
+    def write_info(self, ticker, fields, fetched_at=None):
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        rows = [(ticker, field, json.dumps(value), fetched_at) for field, value in fields.items()]
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO metadata (ticker, field, value, fetched_at) VALUES (?, ?, ?, ?)", rows)
+
+    # --- 사전 적재(prewarm) 기록 ---
+    def record_prewarm(self, started_at, finished_at, ok, failed, error=None):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO prewarm_runs (started_at, finished_at, ok, failed, error) VALUES (?, ?, ?, ?, ?)",
+                (started_at, finished_at, ok, ",".join(failed), error),
+            )
+
+    def last_prewarm(self):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT started_at, finished_at, ok, failed, error FROM prewarm_runs ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return None
+        return {"started_at": row[0], "finished_at": row[1], "ok": row[2],
+                "failed": [t for t in (row[3] or "").split(",") if t], "error": row[4]}
+
+    def prune(self):
+        cutoff = _to_day(datetime.now() - timedelta(days=self.retention_days))
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM prices WHERE date < ?", (cutoff,)).rowcount
+
+    # --- 증분 로딩 ---
+    def load_history(self, ticker, start, end, fetch):
+        """캐시된 종가에 마지막 캐시 날짜 이후의 봉만 덧붙여 [start, end) 구간을 반환합니다.
+
+        fetch(start, end)는 yfinance의 history()처럼 'Close' 열을 가진 DataFrame을 돌려주는 함수입니다.
+        """
+        last = self.last_date(ticker)
+        covered = self.covered_from(ticker)
+        fetched_at = self.last_fetched(ticker)
+
+        if last is None or covered is None or covered > _naive(start):
+            # 콜드 로딩: 기존과 동일하게 전체 기간을 받아옵니다.
+            self.upsert(ticker, fetch(start, end), covered_from=start)
+        elif time.time() - fetched_at > self.max_age_seconds and last + timedelta(days=1) < _naive(end):
+            try:
+                self.upsert(ticker, fetch(last + timedelta(days=1), end))
+            except Exception:
+                # 오프라인 등으로 증분 요청이 실패하면 캐시된 데이터만으로 진행합니다.
+                pass
+        return self.read(ticker, start, end)
+
+
+def _naive(ts):
+    ts = pd.Timestamp(ts)
+    return (ts.tz_localize(None) if ts.tzinfo is not None else ts).to_pydatetime()
+
+
+def _to_day(ts):
+    return pd.Timestamp(ts).strftime("%Y-%m-%d")
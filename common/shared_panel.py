@@ -0,0 +1,137 @@
+"""세션·프로세스가 함께 읽는 읽기 전용 시가총액 패널 (메모리 맵 .npy + JSON 색인).
+
+패널 값은 (날짜 × 기업) float32 행렬 하나로 .npy 파일에 쓰고, 날짜·열 이름·버전은 작은 JSON 색인 파일에 둡니다.
+읽는 쪽은 np.load(mmap_mode="r")로 파일을 메모리에 매핑해 복사 없이 DataFrame으로 감싸므로, 같은 서버의 여러
+세션과 여러 서버 프로세스가 운영체제 페이지 캐시의 한 벌을 나눠 씁니다.
+
+새 버전은 새 파일 이름으로 다 쓴 뒤 색인 파일을 os.replace로 바꿔치기해 게시합니다. 이미 예전 버전을
+매핑한 읽기 쪽은 그대로 읽을 수 있고, 다음 조회 때 색인의 버전이 바뀐 것을 보고 새 파일로 넘어갑니다.
+"""
+import glob
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PANEL_DIR = os.environ.get(
+    "SHARED_PANEL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "panels"),
+)
+# 게시한 뒤에도 남겨 둘 예전 버전 수 (막 바뀐 순간에 예전 색인을 읽은 프로세스를 위해)
+KEEP_VERSIONS = 2
+
+
+def _index_path(directory, name):
+    return os.path.join(directory, f"{name}.json")
+
+
+def publish_panel(frame, name, key=None, meta=None, directory=DEFAULT_PANEL_DIR):
+    """DataFrame(날짜 인덱스 × 기업 열)을 새 버전으로 게시하고 버전 문자열을 반환합니다.
+
+    key는 패널을 만든 조건(티커 목록, 기준일 등)을 나타내는 문자열로, 읽는 쪽이 재사용 여부를 판단할 때 씁니다.
+    meta는 색인에 함께 저장할 JSON 직렬화 가능한 값입니다. (예: 수집에 실패한 티커 목록)
+    """
+    os.makedirs(directory, exist_ok=True)
+    version = f"{time.time_ns():x}-{os.getpid()}"
+    data_file = f"{name}-{version}.npy"
+    values = np.ascontiguousarray(frame.to_numpy(dtype=np.float32))
+
+    # 데이터 파일 → 색인 순서로 쓰고, 둘 다 임시 이름에서 os.replace로 옮겨 반쯤 쓴 파일이 보이지 않게 합니다.
+    tmp = os.path.join(directory, f".{data_file}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, values)
+    os.replace(tmp, os.path.join(directory, data_file))
+
+    index = {
+        "version": version,
+        "file": data_file,
+        "key": key,
+        "created_at": time.time(),
+        "dates": frame.index.strftime("%Y-%m-%d").tolist(),
+        "columns": [str(c) for c in frame.columns],
+        "index_name": frame.index.name,
+        "shape": list(values.shape),
+        "meta": meta or {},
+    }
+    tmp = os.path.join(directory, f".{name}.json.{version}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp, _index_path(directory, name))
+
+    _remove_old_versions(directory, name, keep=data_file)
+    return version
+
+
+def _remove_old_versions(directory, name, keep):
+    # 최신 KEEP_VERSIONS개만 남깁니다. 이미 매핑한 프로세스는 파일이 지워져도 계속 읽을 수 있습니다. (POSIX)
+    files = sorted(glob.glob(os.path.join(directory, f"{name}-*.npy")), key=os.path.getmtime, reverse=True)
+    for path in files[KEEP_VERSIONS:]:
+        if os.path.basename(path) != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def unpublish_panel(name, directory=DEFAULT_PANEL_DIR):
+    """name 패널을 내립니다. (주가 캐시를 초기화해 다음 로딩 때 새로 수집하게 할 때)
+
+    색인을 먼저 지워 새 조회가 곧바로 수집 경로로 가게 하고, 데이터 파일은 그다음에 지웁니다.
+    이미 매핑한 읽기 쪽은 파일이 지워져도 계속 읽을 수 있습니다. (POSIX)
+    """
+    for path in [_index_path(directory, name)] + glob.glob(os.path.join(directory, f"{name}-*.npy")):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def read_index(name, directory=DEFAULT_PANEL_DIR):
+    try:
+        with open(_index_path(directory, name), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def open_panel(index, directory=DEFAULT_PANEL_DIR):
+    """색인이 가리키는 버전을 메모리 맵으로 열어 읽기 전용 DataFrame으로 감쌉니다. (값 복사 없음)"""
+    values = np.load(os.path.join(directory, index["file"]), mmap_mode="r")
+    dates = pd.DatetimeIndex(index["dates"], name=index.get("index_name"))
+    return pd.DataFrame(values, index=dates, columns=index["columns"], copy=False)
+
+
+class SharedPanelReader:
+    # 프로세스 안에서 이름별로 최근에 연 버전을 보관하고, 색인 파일이 바뀌었을 때만 다시 엽니다.
+    def __init__(self, directory=DEFAULT_PANEL_DIR):
+        self.directory = directory
+        self._opened = {}  # name -> (색인 파일 mtime, 색인, DataFrame)
+        self._lock = threading.Lock()
+
+    def get(self, name, key=None, max_age_seconds=None):
+        """게시된 패널을 (DataFrame, 색인)으로 반환합니다. 없거나 key가 다르거나 너무 오래됐으면 (None, None)."""
+        try:
+            mtime = os.stat(_index_path(self.directory, name)).st_mtime_ns
+        except OSError:
+            return None, None
+        with self._lock:
+            cached = self._opened.get(name)
+            if cached is None or cached[0] != mtime:
+                index = read_index(name, self.directory)
+                if index is None:
+                    return None, None
+                try:
+                    cached = (mtime, index, open_panel(index, self.directory))
+                except OSError:
+                    # 색인을 읽은 직후 새 버전이 게시되며 파일이 정리된 경우: 다음 조회 때 다시 엽니다.
+                    return None, None
+                self._opened[name] = cached
+        _, index, frame = cached
+        if key is not None and index.get("key") != key:
+            return None, None
+        if max_age_seconds is not None and time.time() - index["created_at"] > max_age_seconds:
+            return None, None
+        return frame, index
@@ -0,0 +1,92 @@
+"""위도·경도 격자 기반 공간 색인: 반경 검색과 k-최근접 검색.
+
+지점들을 일정한 크기(도 단위)의 격자 칸 번호로 정렬해 두면, 한 위도 줄에 속한 칸들이 정렬 순서에서
+연속 구간이 됩니다. 질의는 반경을 덮는 위도 줄마다 searchsorted로 구간을 잘라 후보를 모은 뒤,
+후보에 대해서만 하버사인 거리를 계산합니다.
+"""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GeoGridIndex:
+    def __init__(self, coords, cell_degrees=0.25):
+        # coords: (지점 수, 2) 모양의 [위도, 경도] 배열
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.cell_degrees = cell_degrees
+        self.n_lat = int(np.ceil(180 / cell_degrees))
+        self.n_lon = int(np.ceil(360 / cell_degrees))
+        keys = self._cell_rows(coords[:, 0]) * self.n_lon + self._cell_cols(coords[:, 1])
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+        self.lat = coords[self.order, 0]
+        self.lon = coords[self.order, 1]
+
+    def __len__(self):
+        return len(self.order)
+
+    def _cell_rows(self, lat):
+        return np.clip(((np.asarray(lat) + 90) // self.cell_degrees).astype(np.int64), 0, self.n_lat - 1)
+
+    def _cell_cols(self, lon):
+        return (((np.asarray(lon) + 180) % 360) // self.cell_degrees).astype(np.int64) % self.n_lon
+
+    def _candidates(self, lat, lon, radius_km):
+        # 반경을 덮는 위도 줄 × 경도 칸 범위의 정렬 위치 구간들을 모읍니다.
+        dlat = radius_km / KM_PER_DEGREE
+        row_lo, row_hi = self._cell_rows(lat - dlat), self._cell_rows(lat + dlat)
+        # 구면에서 중심으로부터 각거리 r 안의 점들의 최대 경도 차는 asin(sin r / cos 위도)입니다.
+        ratio = np.sin(min(radius_km / EARTH_RADIUS_KM, np.pi / 2)) / max(np.cos(np.radians(lat)), 1e-12)
+        dlon = 180.0 if ratio >= 1 else float(np.degrees(np.arcsin(ratio)))
+        if dlon >= 180 or row_hi == self.n_lat - 1 or row_lo == 0:
+            col_ranges = [(0, self.n_lon - 1)]
+        else:
+            col_lo, col_hi = int(self._cell_cols(lon - dlon)), int(self._cell_cols(lon + dlon))
+            # 날짜 변경선을 넘으면 경도 칸 범위가 두 구간으로 나뉩니다.
+            col_ranges = [(col_lo, col_hi)] if col_lo <= col_hi else [(col_lo, self.n_lon - 1), (0, col_hi)]
+
+        rows = np.arange(row_lo, row_hi + 1)
+        starts, ends = [], []
+        for col_lo, col_hi in col_ranges:
+            starts.append(np.searchsorted(self.sorted_keys, rows * self.n_lon + col_lo, side="left"))
+            ends.append(np.searchsorted(self.sorted_keys, rows * self.n_lon + col_hi, side="right"))
+        starts, ends = np.concatenate(starts), np.concatenate(ends)
+        keep = ends > starts
+        if not keep.any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(s, e) for s, e in zip(starts[keep], ends[keep])])
+
+    def query_radius(self, lat, lon, radius_km):
+        """(lat, lon)에서 radius_km 안의 지점들을 가까운 순으로 (원래 인덱스 배열, 거리 km 배열)로 반환합니다."""
+        slots = self._candidates(lat, lon, radius_km)
+        distances = haversine_km(lat, lon, self.lat[slots], self.lon[slots])
+        inside = distances <= radius_km
+        slots, distances = slots[inside], distances[inside]
+        nearest = np.argsort(distances, kind="stable")
+        return self.order[slots[nearest]], distances[nearest]
+
+    def query_nearest(self, lat, lon, k):
+        """가장 가까운 k개 지점을 (원래 인덱스 배열, 거리 km 배열)로 반환합니다.
+
+        한 칸 크기에서 시작해 반경을 두 배씩 늘리며, 반경 안에 k개 이상이 들어오면 그 안의 가장 가까운 k개가 답입니다.
+        """
+        k = min(int(k), len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        radius_km = self.cell_degrees * KM_PER_DEGREE
+        while radius_km < np.pi * EARTH_RADIUS_KM:
+            indices, distances = self.query_radius(lat, lon, radius_km)
+            if len(indices) >= k:
+                return indices[:k], distances[:k]
+            radius_km *= 2
+        # 지구 반 바퀴보다 넓으면 모든 지점이 후보입니다.
+        distances = haversine_km(lat, lon, self.lat, self.lon)
+        nearest = np.argsort(distances, kind="stable")[:k]
+        return self.order[nearest], distances[nearest]
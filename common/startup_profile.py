@@ -0,0 +1,143 @@
+"""페이지별 콜드 스타트 프로파일: import 시간 트리와 첫 화면까지 걸린 시간.
+
+페이지마다 새 파이썬 프로세스를 띄워 `-X importtime`으로 실행하고, streamlit을 미리 import한 뒤(서버
+프로세스에는 이미 올라와 있으므로) AppTest로 페이지를 한 번 실행합니다. 그 사이에 처음 import된
+모듈들을 트리로 정리하고, 첫 실행과 두 번째 실행(캐시가 찬 상태)의 시간을 기록합니다.
+
+    python -m common.startup_profile                        # 모든 페이지, 표 출력
+    python -m common.startup_profile pages/01_geopark.py --output startup_profile.json
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_MARKER = "#startup-profile: page start"
+
+# 자식 프로세스에서 실행할 코드. 표시 문자열 이후의 importtime 줄이 페이지가 일으킨 import입니다.
+_CHILD = """
+import json, sys, time
+import streamlit
+from streamlit.testing.v1 import AppTest
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+at = AppTest.from_file({page!r}, default_timeout={timeout})
+start = time.perf_counter()
+at.run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+at.run()
+second = time.perf_counter() - start
+print(json.dumps({{"first_render_s": first, "warm_rerun_s": second,
+                  "exceptions": [str(e.value) for e in at.exception]}}))
+"""
+
+
+def default_pages(root=ROOT):
+    return [os.path.join(root, "main.py")] + sorted(glob.glob(os.path.join(root, "pages", "*.py")))
+
+
+def parse_importtime(lines):
+    """`-X importtime` 출력 줄들을 [{"module", "self_ms", "cumulative_ms", "children"}] 트리로 바꿉니다.
+
+    출력은 자식이 부모보다 먼저 나오는 후위 순서이고, 모듈 이름 앞의 공백 두 칸이 한 단계 깊이입니다.
+    """
+    pending = {}
+    for line in lines:
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        head, cumulative_us, name = line.split("|", 2)
+        self_us = head.split(":", 1)[1]
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        node = {
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "children": pending.pop(depth + 1, []),
+        }
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+def isolated_env(tmp):
+    """측정용 자식 프로세스의 환경 변수. 가짜 데이터 소스와 tmp 아래의 빈 캐시를 씁니다.
+
+    측정이 네트워크(yfinance)를 부르거나 실제 서버의 캐시·지표 파일(.cache/)에 기록하지 않도록 benchmark도 같은 환경을 씁니다.
+    """
+    return dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])),
+        STOCK_DATA_PROVIDER="fake",
+        PRICE_CACHE_PATH=os.path.join(tmp, "prices.sqlite"),
+        CATALOG_DB_PATH=os.path.join(tmp, "catalog.sqlite"),
+        # 단계별 시간 기록(tracing)을 켜서 내보내기 비용까지 재되, 파일은 tmp에 씁니다.
+        PAGE_METRICS="1",
+        PAGE_METRICS_DIR=os.path.join(tmp, "metrics"),
+        SHARED_PANEL_DIR=os.path.join(tmp, "panels"),
+        PRICE_PREWARM_IN_PROCESS="0",
+    )
+
+
+def profile_page(page, timeout=120):
+    code = _CHILD.format(marker=PAGE_MARKER, page=os.path.abspath(page), timeout=timeout)
+    with tempfile.TemporaryDirectory(prefix="startup-") as tmp:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, cwd=ROOT, env=isolated_env(tmp), timeout=timeout * 3,
+        )
+    stderr = proc.stderr.splitlines()
+    after_marker = stderr[stderr.index(PAGE_MARKER) + 1:] if PAGE_MARKER in stderr else []
+    imports = parse_importtime(after_marker)
+    result = {"page": os.path.relpath(page, ROOT), "returncode": proc.returncode}
+    try:
+        result.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+    except (IndexError, ValueError):
+        result["error"] = "\n".join(stderr[-5:])
+    result["import_ms"] = sum(node["cumulative_ms"] for node in imports)
+    result["imports"] = sorted(imports, key=lambda node: -node["cumulative_ms"])
+    return result
+
+
+def format_report(results, top=8, depth=2):
+    lines = []
+    for r in results:
+        lines.append(
+            f"{r['page']}: 첫 화면 {r.get('first_render_s', float('nan')):.2f}s, "
+            f"다시 실행 {r.get('warm_rerun_s', float('nan')):.2f}s, 페이지 import {r['import_ms']:.0f}ms"
+        )
+        if r.get("error") or r.get("exceptions"):
+            lines.append(f"  오류: {r.get('error') or r['exceptions']}")
+        lines.extend(_format_tree(r["imports"][:top], depth))
+    return "\n".join(lines)
+
+
+def _format_tree(nodes, depth, indent=1):
+    lines = []
+    for node in nodes:
+        lines.append(f"{'  ' * indent}{node['cumulative_ms']:8.1f}ms  {node['module']}")
+        if depth > 1:
+            children = sorted(node["children"], key=lambda n: -n["cumulative_ms"])[:3]
+            lines.extend(_format_tree([c for c in children if c["cumulative_ms"] >= 5], depth - 1, indent + 1))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="페이지별 콜드 스타트(import 시간, 첫 화면 시간)를 측정합니다.")
+    parser.add_argument("pages", nargs="*", help="측정할 페이지 (기본값: main.py와 pages/*.py 전부)")
+    parser.add_argument("--output", help="결과를 저장할 JSON 경로")
+    parser.add_argument("--top", type=int, default=8, help="페이지마다 보여 줄 무거운 import 개수")
+    args = parser.parse_args(argv)
+
+    results = [profile_page(page) for page in (args.pages or default_pages())]
+    print(format_report(results, top=args.top))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
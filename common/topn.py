@@ -0,0 +1,73 @@
+"""날짜별 시가총액 순위표와 실제 Top-N 구성.
+
+고정된 티커 목록 대신, 불러온 모든 기업을 거래일마다 시가총액으로 순위를 매깁니다.
+행(날짜)마다 np.argpartition으로 상위 depth개만 고른 뒤 그 안에서만 정렬하므로 전체 정렬보다 가볍고,
+depth 이하의 어떤 N이든 순위표의 앞 N열을 잘라 쓰면 되므로 N을 바꿀 때 다시 계산하지 않습니다.
+"""
+import numpy as np
+import pandas as pd
+
+# 순위표에 보관할 최대 순위 (슬라이더로 고를 수 있는 N의 상한)
+RANK_DEPTH = 50
+# 휴장일이 다른 해외 상장 종목 등이 하루 빠졌다고 순위에서 떨어지지 않도록, 직전 값을 이 거래일 수까지 이어 씁니다.
+FILL_LIMIT = 5
+
+
+def top_k_per_row(values, k):
+    """각 행에서 큰 값 k개의 열 인덱스를 큰 순서로 반환합니다. 유효 값이 k개보다 적은 칸은 -1입니다."""
+    filled = np.where(np.isnan(values), -np.inf, values)
+    part = np.argpartition(-filled, k - 1, axis=1)[:, :k]
+    part_values = np.take_along_axis(filled, part, axis=1)
+    order = np.argsort(-part_values, axis=1, kind="stable")
+    top = np.take_along_axis(part, order, axis=1)
+    top[np.isinf(np.take_along_axis(part_values, order, axis=1))] = -1
+    return top
+
+
+class RankTable:
+    def __init__(self, panel, depth=RANK_DEPTH):
+        self.panel = panel.ffill(limit=FILL_LIMIT)
+        self.dates = panel.index
+        self.columns = list(panel.columns)
+        self.depth = min(depth, len(self.columns))
+        self.top = top_k_per_row(self.panel.to_numpy(dtype=np.float64), self.depth)  # (날짜, depth) 열 인덱스
+
+    def membership(self, n):
+        # (날짜, 기업) 불리언 행렬: 그날 상위 n위 안에 들었는지
+        top = self.top[:, :n]
+        valid = top >= 0
+        rows = np.broadcast_to(np.arange(len(self.dates))[:, None], top.shape)
+        mask = np.zeros((len(self.dates), len(self.columns)), dtype=bool)
+        mask[rows[valid], top[valid]] = True
+        return mask
+
+    def top_n_frame(self, n):
+        """그날 상위 n위 안에 든 날의 값만 남긴 패널. 한 번이라도 든 기업의 열만, 최근 순위 순으로 담습니다."""
+        mask = self.membership(n)
+        ever = mask.any(axis=0)
+        latest = [self.columns[j] for j in self.top[-1, :n] if j >= 0]
+        order = latest + [c for c, e in zip(self.columns, ever) if e and c not in latest]
+        return self.panel.where(mask)[order]
+
+    def changes(self, n):
+        # Top-N 구성이 바뀐 날짜별 진입·이탈 기업
+        mask = self.membership(n)
+        entered = mask[1:] & ~mask[:-1]
+        exited = mask[:-1] & ~mask[1:]
+        rows = np.flatnonzero(entered.any(axis=1) | exited.any(axis=1))
+        return pd.DataFrame({
+            "날짜": self.dates[rows + 1],
+            "진입": [", ".join(self.columns[j] for j in np.flatnonzero(entered[i])) for i in rows],
+            "이탈": [", ".join(self.columns[j] for j in np.flatnonzero(exited[i])) for i in rows],
+        })
+
+    def frames(self, n, step=1):
+        """막대 경주 애니메이션용 (날짜, [(기업, 값), ...]) 목록. step 거래일마다 하나씩, 마지막 날은 항상 포함합니다."""
+        rows = list(range(0, len(self.dates), step))
+        if rows[-1] != len(self.dates) - 1:
+            rows.append(len(self.dates) - 1)
+        values = self.panel.to_numpy()
+        return [
+            (self.dates[i], [(self.columns[j], float(values[i, j])) for j in self.top[i, :n] if j >= 0])
+            for i in rows
+        ]
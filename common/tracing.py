@@ -0,0 +1,197 @@
+"""페이지 실행(rerun) 단위의 구간 시간 측정과 지표 내보내기.
+
+페이지는 실행마다 RunTrace를 하나 만들고, 데이터 수집·계산·figure 생성 같은 단계를 span()으로 감쌉니다.
+실행이 끝나면(finish) 다음으로 내보냅니다.
+
+- JSON Lines: 실행 하나가 한 줄 ({"page", "started_at", "total_s", "spans": [...]}).
+  파일이 PAGE_METRICS_MAX_BYTES를 넘으면 spans.jsonl.1, .2, ... 로 밀어내고 새 파일에 씁니다.
+- Prometheus 텍스트 형식: 페이지·구간별 지연 시간 히스토그램. 히스토그램은 프로세스마다 따로 쌓이므로
+  프로세스별 파일(page_latency-<pid>.prom)에 pid 레이블을 붙여 통째로 새로 써서 교체합니다.
+  (node_exporter textfile 수집기가 디렉터리의 *.prom을 모두 읽음. 끝난 프로세스의 파일은 다음 내보내기 때 지움)
+
+파일은 PAGE_METRICS=1 일 때만 씁니다(기본 꺼짐). 디버그 사이드바는 PAGE_DEBUG_TIMINGS=1 이거나 주소에 ?debug=1 이 있을 때 보입니다.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_DIR = os.environ.get(
+    "PAGE_METRICS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "metrics"),
+)
+# 파일 내보내기는 PAGE_METRICS=1 로 켤 때만 합니다. (기본은 꺼짐: 서버 디스크에 쓰지 않음)
+METRICS_ENABLED = os.environ.get("PAGE_METRICS", "0") == "1"
+SPANS_JSONL = "spans.jsonl"
+SPANS_MAX_BYTES = int(os.environ.get("PAGE_METRICS_MAX_BYTES", 50 * 1024 * 1024))
+SPANS_BACKUPS = 3
+PROMETHEUS_PREFIX = "page_latency-"
+# 히스토그램 버킷 상한(초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistograms:
+    # (지표 이름, 레이블 묶음)별 누적 히스토그램. 프로세스 안의 모든 세션이 함께 씁니다.
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._series = {}  # (name, labels) -> [버킷별 개수..., +Inf 개수, 합]
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += seconds
+
+    def to_prometheus(self, **const_labels):
+        # const_labels(예: pid)는 모든 시계열에 덧붙입니다.
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines, described = [], set()
+        for (name, labels), series in items:
+            if name not in described:
+                lines.append(f"# HELP {name} Streamlit page latency in seconds.")
+                lines.append(f"# TYPE {name} histogram")
+                described.add(name)
+            base = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels + tuple(sorted(const_labels.items())))
+            sep = "," if base else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{name}_bucket{{{base}{sep}le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{base}{sep}le="+Inf"}} {series[len(self.buckets)]}')
+            lines.append(f"{name}_sum{{{base}}} {series[-1]:.6f}")
+            lines.append(f"{name}_count{{{base}}} {series[len(self.buckets)]}")
+        return "\n".join(lines) + "\n"
+
+
+HISTOGRAMS = LatencyHistograms()
+_write_lock = threading.Lock()
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RunTrace:
+    def __init__(self, page):
+        self.page = page
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.spans = []  # {"name", "start_s", "duration_s", "depth", 추가 속성...}
+        self._depth = 0
+
+    @contextmanager
+    def span(self, name, **attrs):
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.record(name, time.perf_counter() - start, start=start, **attrs)
+
+    def record(self, name, seconds, start=None, **attrs):
+        # 다른 스레드에서 잰 시간(예: 티커별 수집)처럼 구간을 나중에 기록할 때도 씁니다.
+        self.spans.append(dict(
+            name=name,
+            start_s=round(((start if start is not None else time.perf_counter() - seconds) - self._start), 6),
+            duration_s=round(seconds, 6),
+            depth=self._depth,
+            **attrs,
+        ))
+
+    def totals(self):
+        # 구간 이름별 (합계 시간, 횟수). 디버그 표와 히스토그램에 씁니다.
+        totals = {}
+        for span in self.spans:
+            total, count = totals.get(span["name"], (0.0, 0))
+            totals[span["name"]] = (total + span["duration_s"], count + 1)
+        return totals
+
+    def finish(self, metrics_dir=None):
+        """실행을 마치고 히스토그램에 더한 뒤 파일로 내보냅니다. 전체 시간(초)을 반환합니다."""
+        total = time.perf_counter() - self._start
+        HISTOGRAMS.observe("page_run_seconds", total, page=self.page)
+        for name, (seconds, _) in self.totals().items():
+            HISTOGRAMS.observe("page_span_seconds", seconds, page=self.page, span=name)
+        if METRICS_ENABLED:
+            export(self, total, metrics_dir or METRICS_DIR)
+        self.total_s = total
+        return total
+
+
+def export(trace, total, metrics_dir):
+    os.makedirs(metrics_dir, exist_ok=True)
+    record = {"page": trace.page, "started_at": trace.started_at, "total_s": round(total, 6), "spans": trace.spans}
+    pid = os.getpid()
+    with _write_lock:
+        spans_path = os.path.join(metrics_dir, SPANS_JSONL)
+        _rotate(spans_path)
+        with open(spans_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        # 수집기가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체합니다.
+        path = os.path.join(metrics_dir, f"{PROMETHEUS_PREFIX}{pid}.prom")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(HISTOGRAMS.to_prometheus(pid=pid))
+        os.replace(tmp, path)
+        _remove_dead_process_files(metrics_dir)
+
+
+def _rotate(path):
+    # 크기 기준 순환. 여러 프로세스가 동시에 돌려도 os.replace는 원자적이라 줄이 섞이거나 깨지지 않습니다.
+    try:
+        if os.path.getsize(path) < SPANS_MAX_BYTES:
+            return
+    except OSError:
+        return
+    for i in range(SPANS_BACKUPS - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+    os.replace(path, f"{path}.1")
+
+
+def _remove_dead_process_files(metrics_dir):
+    for name in os.listdir(metrics_dir):
+        if not (name.startswith(PROMETHEUS_PREFIX) and name.endswith(".prom")):
+            continue
+        try:
+            pid = int(name[len(PROMETHEUS_PREFIX):-len(".prom")])
+            os.kill(pid, 0)
+        except ValueError:
+            continue
+        except ProcessLookupError:
+            try:
+                os.remove(os.path.join(metrics_dir, name))
+            except OSError:
+                pass
+        except OSError:
+            # 다른 사용자의 살아 있는 프로세스(PermissionError)는 그대로 둡니다.
+            pass
+
+
+def debug_enabled():
+    import streamlit as st
+
+    return os.environ.get("PAGE_DEBUG_TIMINGS") == "1" or st.query_params.get("debug") == "1"
+
+
+def render_debug_sidebar(trace):
+    """사이드바에 이번 실행의 구간별 시간을 보여 줍니다. finish() 뒤에 호출합니다."""
+    import streamlit as st
+
+    with st.sidebar.expander("⏱️ 실행 시간 (디버그)", expanded=True):
+        st.caption(f"전체 {getattr(trace, 'total_s', 0.0) * 1000:,.1f} ms · 구간 {len(trace.spans)}개")
+        totals = sorted(trace.totals().items(), key=lambda item: -item[1][0])
+        st.dataframe(
+            {
+                "구간": [name for name, _ in totals],
+                "시간 (ms)": [round(seconds * 1000, 2) for _, (seconds, _) in totals],
+                "횟수": [count for _, (_, count) in totals],
+            },
+            use_container_width=True, hide_index=True,
+        )
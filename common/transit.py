@@ -0,0 +1,159 @@
+"""식현상(transit) 밝기 변화 계산.
+
+calculate_flux_change는 값 하나를 계산하는 원래의 스칼라 버전이고, overlap_fraction은 같은 기하를
+배열 전체에 대해 마스크로 한 번에 계산하는 벡터화 버전입니다. (두 결과는 verify_against_scalar로 비교)
+"""
+import numpy as np
+
+
+def calculate_flux_change(star_radius_km, planet_radius_km, distance_from_center_of_star):
+    R_s = star_radius_km
+    R_p = planet_radius_km
+    d = distance_from_center_of_star
+
+    if d >= R_s + R_p:
+        return 0.0
+    elif d <= abs(R_s - R_p):
+        if R_p <= R_s:
+            return (np.pi * R_p**2) / (np.pi * R_s**2)
+        else:
+            return 1.0
+
+    else:
+        arg1_arccos = (d**2 + R_s**2 - R_p**2) / (2 * d * R_s)
+        arg2_arccos = (d**2 + R_p**2 - R_s**2) / (2 * d * R_p)
+
+        arg1_arccos = np.clip(arg1_arccos, -1.0, 1.0)
+        arg2_arccos = np.clip(arg2_arccos, -1.0, 1.0)
+
+        alpha = np.arccos(arg1_arccos)
+        beta = np.arccos(arg2_arccos)
+
+        area_overlap = R_s**2 * alpha + R_p**2 * beta - 0.5 * np.sqrt(
+            (-d + R_s + R_p) * (d + R_s - R_p) * (d - R_s + R_p) * (d + R_s + R_p)
+        )
+        return area_overlap / (np.pi * R_s**2)
+
+
+def overlap_fraction(star_radius_km, planet_radius_km, distance_from_center_of_star):
+    """행성 원반이 가리는 항성 원반 넓이의 비율을 배열 단위로 계산합니다.
+
+    세 인자는 NumPy 브로드캐스팅 규칙에 따라 어떤 모양이든 될 수 있습니다.
+    겹침 없음(d >= R_s + R_p), 완전 겹침(d <= |R_s - R_p|), 부분 겹침 구간을 마스크로 나눠 처리합니다.
+    """
+    R_s, R_p, d = np.broadcast_arrays(
+        np.asarray(star_radius_km, dtype=np.float64),
+        np.asarray(planet_radius_km, dtype=np.float64),
+        np.abs(np.asarray(distance_from_center_of_star, dtype=np.float64)),
+    )
+    result = np.zeros(d.shape)
+
+    full = d <= np.abs(R_s - R_p)
+    result[full] = np.where(R_p[full] <= R_s[full], R_p[full]**2 / R_s[full]**2, 1.0)
+
+    partial = ~full & (d < R_s + R_p)
+    if partial.any():
+        rs, rp, dd = R_s[partial], R_p[partial], d[partial]
+        alpha = np.arccos(np.clip((dd**2 + rs**2 - rp**2) / (2 * dd * rs), -1.0, 1.0))
+        beta = np.arccos(np.clip((dd**2 + rp**2 - rs**2) / (2 * dd * rp), -1.0, 1.0))
+        kite = (-dd + rs + rp) * (dd + rs - rp) * (dd - rs + rp) * (dd + rs + rp)
+        area_overlap = rs**2 * alpha + rp**2 * beta - 0.5 * np.sqrt(np.maximum(kite, 0.0))
+        result[partial] = area_overlap / (np.pi * rs**2)
+    return result
+
+
+def relative_flux(star_radius_km, planet_radius_km, x_orbit):
+    # 행성이 x축 방향으로 지나간다고 보고, 항성 중심으로부터의 투영 거리 |x|로 상대 밝기를 계산합니다.
+    return 1.0 - overlap_fraction(star_radius_km, planet_radius_km, np.abs(x_orbit))
+
+
+def verify_against_scalar(star_radius_km, planet_radius_km, distances, rtol=1e-9, atol=1e-12):
+    """벡터화 결과가 스칼라 calculate_flux_change와 일치하는지 확인하고 최대 절대 오차를 반환합니다."""
+    distances = np.asarray(distances, dtype=np.float64)
+    vectorized = overlap_fraction(star_radius_km, planet_radius_km, distances)
+    scalar = np.array([calculate_flux_change(star_radius_km, planet_radius_km, abs(d)) for d in distances])
+    max_error = float(np.max(np.abs(vectorized - scalar))) if distances.size else 0.0
+    return np.allclose(vectorized, scalar, rtol=rtol, atol=atol), max_error
+
+
+def contact_angles(star_radius_km, planet_radius_km, distance_km):
+    """원 궤도(x = D cos θ)에서 1~4차 접촉이 일어나는 궤도 각 θ를 반환합니다.
+
+    투영 거리 |x|가 R_s + R_p(1·4차 접촉), |R_s - R_p|(2·3차 접촉)가 되는 각을 θ = π/2, 3π/2 주변에서 구합니다.
+    궤도 전체가 항성 원반과 겹치면(D <= R_s + R_p) None을 반환합니다.
+    """
+    outer = star_radius_km + planet_radius_km
+    if distance_km <= outer:
+        return None
+    inner = abs(star_radius_km - planet_radius_km)
+    half_outer = np.arcsin(outer / distance_km)
+    half_inner = np.arcsin(min(inner / distance_km, 1.0))
+    centers = np.array([np.pi / 2, 3 * np.pi / 2])
+    return np.sort(np.concatenate([
+        centers - half_outer, centers - half_inner, centers + half_inner, centers + half_outer,
+    ]))
+
+
+def adaptive_theta(star_radius_km, planet_radius_km, distance_km, num_steps, dense_fraction=0.9, margin=0.25):
+    """식현상 구간(접촉점 주변)에 표본을 몰아 둔 [0, 2π] 궤도 각 배열을 반환합니다.
+
+    전체 num_steps 중 dense_fraction은 두 식현상 창(창 폭의 margin만큼 여유 포함)에,
+    나머지는 밝기가 1.0으로 일정한 구간에 고르게 배치합니다. 접촉각은 항상 포함됩니다.
+    """
+    contacts = contact_angles(star_radius_km, planet_radius_km, distance_km)
+    if contacts is None:
+        return np.linspace(0, 2 * np.pi, num_steps)
+
+    half_width = (contacts[3] - contacts[0]) / 2 * (1 + margin)
+    centers = np.array([np.pi / 2, 3 * np.pi / 2])
+    n_dense = int(num_steps * dense_fraction) // 2
+    n_sparse = max(2, num_steps - 2 * n_dense - len(contacts))
+
+    dense = [np.linspace(c - half_width, c + half_width, n_dense) for c in centers]
+    sparse = np.linspace(0, 2 * np.pi, n_sparse)
+    in_window = np.zeros(n_sparse, dtype=bool)
+    for c in centers:
+        in_window |= np.abs(sparse - c) < half_width
+    theta = np.concatenate(dense + [sparse[~in_window], contacts, [0.0, 2 * np.pi]])
+    return np.unique(np.clip(theta, 0.0, 2 * np.pi))
+
+
+def sweep_transit_grid(planet_radii_km, star_radii_km, distance_km, impact_parameters=(0.0,),
+                       num_samples=1000, max_chunk_elements=4_000_000):
+    """(행성 반경 × 항성 반경 × 충돌 변수) 격자 전체의 식현상 깊이와 지속 시간을 계산합니다.
+
+    각 격자점마다 num_samples개의 시간 표본으로 광도 곡선을 만들되, 격자 축과 시간 축을 브로드캐스팅해
+    overlap_fraction 한 번으로 계산합니다. 메모리를 제한하기 위해 행성 반경 축을 나눠 처리합니다.
+    충돌 변수 b는 항성 반경 단위이며, 투영 위치는 (D cos θ, b R_s sin θ)입니다.
+
+    반환값: (depth, duration) — 모양은 (행성, 항성, b). depth는 최대 가림 비율,
+    duration은 공전 주기 대비 식현상 지속 시간의 비율입니다.
+    """
+    planet = np.asarray(planet_radii_km, dtype=np.float64)
+    star = np.asarray(star_radii_km, dtype=np.float64)
+    impact = np.asarray(impact_parameters, dtype=np.float64)
+
+    # 격자에서 가장 긴 식현상 창을 덮도록 θ = π/2 주변만 표본화합니다.
+    reach = min(1.0, (star.max() * np.sqrt(1 + impact.max() ** 2) + planet.max()) / distance_km)
+    half_window = np.arcsin(reach)
+    theta = np.linspace(np.pi / 2 - half_window, np.pi / 2 + half_window, num_samples)
+    dtheta = theta[1] - theta[0] if num_samples > 1 else 0.0
+    x = distance_km * np.cos(theta)
+    sin_theta = np.sin(theta)
+
+    depth = np.empty((planet.size, star.size, impact.size))
+    duration = np.empty_like(depth)
+    rows = max(1, max_chunk_elements // max(1, star.size * impact.size * num_samples))
+    R_s = star[None, :, None, None]
+    d = np.hypot(x, impact[None, None, :, None] * R_s * sin_theta)
+    # 가장 깊은 순간은 θ = π/2 (투영 거리 b·R_s)이므로, 깊이는 표본 간격과 관계없이 그 거리에서 바로 구합니다.
+    # (격자에서 가장 큰 항성에 맞춘 창을 num_samples개로 나누면 작은 항성에서는 중심을 건너뛸 수 있음)
+    closest = impact[None, None, :] * star[None, :, None]
+    for start in range(0, planet.size, rows):
+        R_p = planet[start:start + rows, None, None, None]
+        blocked = overlap_fraction(R_s, R_p, d)
+        depth[start:start + rows] = np.maximum(
+            blocked.max(axis=-1), overlap_fraction(R_s[..., 0], R_p[..., 0], closest)
+        )
+        duration[start:start + rows] = (blocked > 0).sum(axis=-1) * dtheta / (2 * np.pi)
+    return depth, duration
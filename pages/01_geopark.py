@@ -1,109 +1,117 @@
+import hashlib
+import os
+import time
 import streamlit as st
-import folium
-from streamlit_folium import st_folium
-
-# 국가지질공원 데이터
-geoparks = {
-    "제주특별자치도": {
-        "location": [33.3895, 126.5450],
-        "url": "https://www.jeju.go.kr/geopark/index.htm",
-        "feature": "한라산, 만장굴, 성산일출봉 등 화산활동에 의한 지형이 대표적이며, 현무암 용암지형과 튜물러스, 라바튜브가 잘 보존됨",
-        "tour": ["한라산 등반", "만장굴 탐방", "성산일출봉 일출 감상"]
-    },
-    "울릉도·독도": {
-        "location": [37.4842, 130.9053],
-        "url": "https://ulleung.go.kr/geo/kr/index.do",
-        "feature": "해저 화산활동으로 형성된 화산섬으로, 응회암층, 주상절리, 화산돔 등 다양한 화산 지질 구조가 존재함",
-        "tour": ["독도 탐방", "나리분지 탐방", "태하 모노레일 승차"]
-    },
-    "부산": {
-        "location": [35.1796, 129.0756],
-        "url": "https://www.busan.go.kr/geopark/index",
-        "feature": "오륙도, 송도 해상케이블카 등 해양침식 지형과 주상절리대가 발달함",
-        "tour": ["오륙도 탐방", "송도 해상케이블카 탑승", "광안리 해수욕장 산책"]
-    },
-    "청송": {
-        "location": [36.4350, 129.0572],
-        "url": "https://csgeop.cs.go.kr/",
-        "feature": "빙하 시대의 얼음골, 주왕산 화강암, 대전사 층과 같은 고생대 지층과 침식 지형이 발달함",
-        "tour": ["주왕산 등반", "얼음골 탐방", "대전사 사찰 방문"]
-    },
-    "경북 동해안": {
-        "location": [37.5200, 128.9000],
-        "url": "https://www.geotourism.or.kr/",
-        "feature": "능파대, 문암해변, 송지호해변 등 다양한 해양 지질 구조가 발달함",
-        "tour": ["능파대 탐방", "문암해변 산책", "송지호해변 일출 감상"]
-    },
-    "한탄강": {
-        "location": [38.0305, 127.0746],
-        "url": "https://www.hantangeopark.kr/",
-        "feature": "현무암 협곡과 용암대지, 하식절벽 등이 뛰어나며, 약 50만 년 전 화산 분출과 하천 침식작용으로 형성됨",
-        "tour": ["현무암 협곡 탐방", "용암대지 산책", "하식절벽 관람"]
-    },
-    "강원 고생대": {
-        "location": [37.7000, 128.2000],
-        "url": "https://www.paleozoicgp.com/",
-        "feature": "운봉산, 송지호해변, 문암해변 등 고생대 지층과 해양 지질 구조가 발달함",
-        "tour": ["운봉산 등반", "송지호해변 산책", "문암해변 일출 감상"]
-    },
-    "백령·대청": {
-        "location": [37.8000, 124.6000],
-        "url": "https://bdgeopark.kr/",
-        "feature": "백령도, 대청도, 해식절벽 등 다양한 해양 지질 구조가 발달함",
-        "tour": ["백령도 탐방", "대청도 산책", "해식절벽 관람"]
-    },
-    "진안·무주": {
-        "location": [35.8000, 127.7000],
-        "url": "https://jmgeopark.kr/",
-        "feature": "진안 고원, 무주 반딧불이, 무주 덕유산 등 다양한 지질 구조가 발달함",
-        "tour": ["진안 고원 탐방", "무주 반딧불이 관람", "덕유산 등반"]
-    },
-    "단양": {
-        "location": [36.9800, 128.1700],
-        "url": "https://www.danyanggeopark.org/www/1",
-        "feature": "단양팔경, 고수동굴, 도담삼봉 등 다양한 지질 구조가 발달함",
-        "tour": ["단양팔경 탐방", "고수동굴 탐방", "도담삼봉 관람"]
-    },
-    "무등산": {
-        "location": [35.1391, 126.9990],
-        "url": "https://geopark.gwangju.go.kr/index.do?S=S01",
-        "feature": "주상절리대가 발달해 있으며, 백악기 화산활동의 흔적이 남아 있음. 광주·전남 일대의 지질유산 보존",
-        "tour": ["무등산 등반", "백운동계곡 산책", "무등산 정상 관람"]
-    },
-    "의성": {
-        "location": [36.3000, 128.4000],
-        "url": "https://www.usc.go.kr/geopark/main.do",
-        "feature": "의성 금성산, 의성 고분군, 의성 호암지 등 다양한 지질 구조가 발달함",
-        "tour": ["의성 금성산 탐방", "의성 고분군 관람", "의성 호암지 산책"]
-    },
-    "고군산군도": {
-        "location": [35.7000, 126.3000],
-        "url": "http://gsgeopark.gunsan.go.kr/",
-        "feature": "고군산군도, 선유도, 장자도 등 다양한 해양 지질 구조가 발달함",
-        "tour": ["고군산군도 탐방", "선유도 산책", "장자도 일출 감상"]
-    },
-    "화성": {
-        "location": [37.2000, 126.8000],
-        "url": "https://tour.hscity.go.kr/geopark/index.jsp",
-        "feature": "화성 제암리, 화성 궁평항, 화성 팔탄리 등 다양한 지질 구조가 발달함",
-        "tour": ["화성 제암리 탐방", "화성 궁평항 산책", "화성 팔탄리 관람"]
-    },
-    "강원 평화지역": {
-        "location": [38.0000, 128.5000],
-        "url": "https://koreadmz.kr/geopark",
-        "feature": "비무장지대(DMZ)와 접한 지역으로, 다양한 지질 구조와 함께 생태계 보존의 중요성이 강조됨",
-        "tour": ["DMZ 탐방", "철원 평화전망대 방문", "화천 평화의 댐 탐방"]
-    }
-}
+from common.data_files import list_data_files, resolve_data_file
+from common.map_render import new_map_html_cache, show_map
+from common.tracing import RunTrace, debug_enabled, render_debug_sidebar
+from common.place_catalog import PlaceCatalog
+from common.poi_catalog import DEFAULT_GEOPARK_CATALOG, cluster_layer, load_poi_catalog
+from common.spatial_index import GeoGridIndex
+
+# 지점이 이보다 많으면 팝업의 설명 문장을 빼서 지도 HTML 크기를 줄입니다.
+POPUP_FEATURE_LIMIT = 20_000
+# 주변 검색 결과 중 지도에 강조 표시하고 표로 보여 줄 최대 개수
+NEARBY_DISPLAY_LIMIT = 500
 
 # Streamlit UI
 st.set_page_config(page_title="대한민국 국가지질공원 지도", layout="wide")
+# 이번 실행의 단계별 시간 (지도 HTML은 캐시에 없을 때만 build_map 구간이 생김)
+trace = RunTrace("geopark")
 st.title("🗺️ 대한민국 국가지질공원 정보")
 
-selected = st.selectbox("지질공원을 선택하세요:", list(geoparks.keys()))
+# 국가지질공원 데이터와 (선택) 지질명소 카탈로그는 파일에서 읽고, 프로세스당 한 번만 읽어 모든 세션이 공유합니다.
+@st.cache_resource(show_spinner="카탈로그를 읽는 중...")
+def get_catalog(path, mtime):
+    return load_poi_catalog(path)
+
+
+@st.cache_resource(show_spinner=False)
+def get_map_points(park_path, park_mtime, site_path, site_mtime):
+    # 지도에 올릴 전체 지점. 카탈로그가 지점별 JSON 행을 보관하므로 합친 결과도 공유해 재사용합니다.
+    return get_catalog(park_path, park_mtime).concat(get_catalog(site_path, site_mtime))
+
+
+def catalog_key(path):
+    # 파일이 바뀌면 수정 시각이 달라져 다시 읽습니다.
+    return path, os.path.getmtime(path)
+
+
+park_key = catalog_key(os.environ.get("GEOPARK_CATALOG_PATH", DEFAULT_GEOPARK_CATALOG))
+geoparks = get_catalog(*park_key)
+
+# 추가 지질명소 카탈로그는 서버 경로를 직접 입력받지 않고, 데이터 디렉터리(data/)의 *geosite* 파일이나
+# 운영자가 GEOSITE_CATALOG_PATH 환경 변수로 지정한 파일 중에서 고릅니다.
+site_choices = {"(없음)": None}
+configured_site_path = os.environ.get("GEOSITE_CATALOG_PATH")
+if configured_site_path:
+    site_choices[f"{os.path.basename(configured_site_path)} (GEOSITE_CATALOG_PATH)"] = configured_site_path
+for name in list_data_files((".csv", ".geojson", ".json"), contains="geosite"):
+    site_choices[name] = resolve_data_file(name)
+
+with st.sidebar:
+    st.subheader("지질명소 카탈로그")
+    site_choice = st.selectbox(
+        "추가 지질명소 카탈로그", list(site_choices), index=1 if configured_site_path else 0,
+        help="데이터 디렉터리의 *geosite*.csv/.geojson 파일 (name, lat, lon, url, feature, tour 열). "
+             "(없음)이면 지질공원만 표시합니다.",
+    )
+site_path = site_choices[site_choice]
+site_key = None
+if site_path:
+    if os.path.exists(site_path):
+        site_key = catalog_key(site_path)
+        st.sidebar.caption(f"지질명소 {len(get_catalog(*site_key)):,}곳을 불러왔습니다.")
+    else:
+        st.sidebar.warning(f"파일을 찾을 수 없습니다: {site_path}")
+points = geoparks if site_key is None else get_map_points(*park_key, *site_key)
+
+
+# 공간 색인도 지점 집합별로 프로세스당 한 번만 만들어 모든 세션이 함께 씁니다.
+@st.cache_resource(show_spinner="공간 색인을 만드는 중...")
+def get_spatial_index(park_key, site_key):
+    indexed = get_catalog(*park_key) if site_key is None else get_map_points(*park_key, *site_key)
+    return GeoGridIndex(indexed.coords)
+
+# 이름·지질 특징·투어 코스 전문 검색은 여러 페이지가 함께 쓰는 카탈로그(SQLite FTS5 색인)로 합니다.
+@st.cache_resource(show_spinner=False)
+def get_place_catalog():
+    return PlaceCatalog()
+
+
+@st.cache_resource(show_spinner="지질명소 검색 색인을 만드는 중...")
+def index_site_catalog(site_path, site_mtime):
+    # 파일이 바뀌었을 때만 다시 색인하며, 색인은 디스크에 남아 프로세스를 다시 시작해도 재사용됩니다.
+    # 세션마다 다른 파일을 쓸 수 있으므로 묶음 이름을 파일 경로로 나눠, 다른 파일의 색인이 덮어쓰지 않게 합니다.
+    collection = "geosites:" + hashlib.sha1(os.path.abspath(site_path).encode("utf-8")).hexdigest()[:12]
+    get_place_catalog().sync_collection(collection, site_path)
+    return collection
+
+
+catalog = get_place_catalog()
+park_names = geoparks.names
+query = st.text_input("지질공원·지질명소 검색", placeholder="예: 현무암, 주상절리, 동굴 탐방")
+if query:
+    park_matches = [place["name"] for place in catalog.search(query, collections=["geoparks"], limit=len(geoparks))]
+    if park_matches:
+        park_names = [name for name in park_matches if name in geoparks] or geoparks.names
+    else:
+        st.info(f"'{query}'에 해당하는 지질공원이 없어 전체 목록을 보여줍니다.")
+    if site_key is not None:
+        site_collection = index_site_catalog(*site_key)
+        site_matches = catalog.search(query, collections=[site_collection])
+        if site_matches:
+            st.caption(f"일치하는 지질명소 (최대 {len(site_matches)}곳)")
+            st.dataframe(
+                {"이름": [p["name"] for p in site_matches],
+                 "위도": [p["lat"] for p in site_matches], "경도": [p["lon"] for p in site_matches]},
+                use_container_width=True, hide_index=True,
+            )
+
+selected = st.selectbox("지질공원을 선택하세요:", park_names)
 
 # 선택된 공원 정보
-info = geoparks[selected]
+info = geoparks.get(selected)
 lat, lon = info["location"]
 
 # 설명 출력
@@ -114,17 +122,86 @@ st.markdown(f"**🚶 추천 지질투어 코스:**")
 for tour in info["tour"]:
     st.markdown(f"- {tour}")
 
-# 지도 생성 및 표시
-m = folium.Map(location=[36.5, 127.8], zoom_start=6)
+# 주변 지질명소 찾기: 기준 위치에서 반경 안 또는 가장 가까운 k곳을 공간 색인으로 찾습니다.
+nearby = None
+with st.expander("📍 주변 지질명소 찾기"):
+    search_on = st.checkbox("주변 검색 결과를 지도에 표시", value=False)
+    near_cols = st.columns(4)
+    query_lat = near_cols[0].number_input("기준 위도", min_value=-90.0, max_value=90.0, value=float(lat), format="%.4f")
+    query_lon = near_cols[1].number_input("기준 경도", min_value=-180.0, max_value=180.0, value=float(lon), format="%.4f")
+    search_mode = near_cols[2].radio("검색 방식", ["반경 안", "가까운 순 k곳"])
+    if search_mode == "반경 안":
+        search_value = near_cols[3].number_input("반경 (km)", min_value=1.0, max_value=2000.0, value=50.0, step=10.0)
+    else:
+        search_value = near_cols[3].number_input("k", min_value=1, max_value=1000, value=10, step=1)
+
+    if search_on:
+        spatial_index = get_spatial_index(park_key, site_key)
+        query_start = time.perf_counter()
+        if search_mode == "반경 안":
+            found, distances = spatial_index.query_radius(query_lat, query_lon, search_value)
+        else:
+            found, distances = spatial_index.query_nearest(query_lat, query_lon, search_value)
+        query_ms = (time.perf_counter() - query_start) * 1000
+        st.caption(f"{len(points):,}곳 중 {len(found):,}곳을 찾았습니다. (질의 시간 {query_ms:.2f} ms)")
+        if len(found) > NEARBY_DISPLAY_LIMIT:
+            st.caption(f"가까운 {NEARBY_DISPLAY_LIMIT}곳만 표시합니다.")
+        found, distances = found[:NEARBY_DISPLAY_LIMIT], distances[:NEARBY_DISPLAY_LIMIT]
+        st.dataframe(
+            {"이름": [points.names[i] for i in found], "거리 (km)": distances.round(2)},
+            use_container_width=True, hide_index=True,
+        )
+        nearby = (query_lat, query_lon, search_mode, search_value, found, distances)
+
+# 선택한 공원과 불러온 카탈로그 조합별로 완성된 지도 HTML을 프로세스 전체에서 공유합니다.
+@st.cache_resource
+def get_map_html_cache():
+    return new_map_html_cache()
+
 
-# 마커 추가
-for name, data in geoparks.items():
+def build_map():
+    # folium(과 folium이 끌어오는 pandas)은 캐시에 지도 HTML이 없을 때만 필요하므로 여기서 가져옵니다.
+    import folium
+
+    # 지도 생성
+    m = folium.Map(location=[36.5, 127.8], zoom_start=6)
+
+    # 선택한 공원만 일반 마커로 강조하고, 나머지 공원과 지질명소는 클러스터 레이어 하나로 그립니다.
     folium.Marker(
-        location=data["location"],
-        popup=f"<b>{name}</b><br><a href='{data['url']}' target='_blank'>홈페이지</a><br><i>{data['feature']}</i>",
-        tooltip=name,
-        icon=folium.Icon(color="green" if name == selected else "blue")
+        location=info["location"],
+        popup=f"<b>{selected}</b><br><a href='{info['url']}' target='_blank'>홈페이지</a><br><i>{info['feature']}</i>",
+        tooltip=selected,
+        icon=folium.Icon(color="green")
     ).add_to(m)
 
+    cluster_layer(points, exclude=[selected], include_features=len(points) <= POPUP_FEATURE_LIMIT).add_to(m)
+
+    if nearby is not None:
+        # 검색 기준점과 (반경 검색이면) 반경 원, 찾은 지점들을 빨간 원으로 강조합니다.
+        query_lat, query_lon, search_mode, search_value, found, distances = nearby
+        folium.Marker(
+            location=[query_lat, query_lon], tooltip="검색 기준 위치",
+            icon=folium.Icon(color="red", icon="screenshot")
+        ).add_to(m)
+        if search_mode == "반경 안":
+            folium.Circle(
+                location=[query_lat, query_lon], radius=search_value * 1000,
+                color="red", weight=1, fill=True, fill_opacity=0.05
+            ).add_to(m)
+        for i, distance in zip(found.tolist(), distances.tolist()):
+            folium.CircleMarker(
+                location=points.coords[i].tolist(), radius=6, color="red", fill=True, fill_opacity=0.8,
+                tooltip=f"{points.names[i]} ({distance:.1f} km)"
+            ).add_to(m)
+    return m
+
+
 # 지도 표시
-st_folium(m, width=800, height=550)
+nearby_key = None if nearby is None else nearby[:4]
+map_key = (selected, park_key, site_key, nearby_key)
+with trace.span("show_map"):
+    show_map(build_map, map_key, get_map_html_cache(), trace=trace, width=800, height=550)
+
+trace.finish()
+if debug_enabled():
+    render_debug_sidebar(trace)
@@ -1,86 +1,237 @@
+import hashlib
+import json
+import os
 import streamlit as st
-import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import yfinance as yf # yfinance 라이브러리 임포트
 from datetime import datetime, timedelta
+from common.data_files import list_data_files, resolve_data_file
+from common.market_data import fetch_all, get_provider
+from common.memo import BoundedMemo
+from common.downsample import WEBGL_POINT_THRESHOLD, lttb_indices, max_points_for_width, minmax_indices
+from common.metadata_cache import MetadataCache, MetadataCachingProvider
+from common.panel_analytics import DEFAULT_VOLATILITY_WINDOWS, PanelAnalytics
+from common.market_panel import DEFAULT_UNIVERSE_CSV, HISTORY_DAYS, TOP_TICKERS, build_market_cap_panel, load_universe
+from common.prewarm import DEFAULT_SCHEDULE, prewarm_status, start_background_prewarmer
+from common.price_store import PriceStore
+from common.shared_panel import SharedPanelReader, publish_panel, unpublish_panel
+from common.topn import RankTable
+from common.tracing import RunTrace, debug_enabled, render_debug_sidebar
 
 st.set_page_config(layout="wide")
+# 이번 실행의 단계별 시간 (수집·패널 구성·figure 생성)
+trace = RunTrace("stock")
 st.title("글로벌 상위 시가총액 Top 10 기업의 3개년 시가총액 변화 (yfinance 데이터 기반)")
 st.write("*(주의: 시가총액은 과거 주가와 현재 발행 주식수를 기준으로 추정되므로 실제와 다를 수 있습니다.)*")
 
 # --- 1. Top 10 기업 티커 및 정보 설정 ---
-# 현재(2025년 6월) 대략적인 글로벌 시총 상위 기업 티커 목록
-# 이 목록은 실제와 다를 수 있으며, 주기적으로 업데이트해야 합니다.
-top_tickers = {
-    "AAPL": "Apple",
-    "MSFT": "Microsoft",
-    "NVDA": "NVIDIA",
-    "GOOGL": "Alphabet", # Google
-    "AMZN": "Amazon",
-    "META": "Meta Platforms",
-    "TSM": "TSMC",
-    "LLY": "Eli Lilly",
-    "JPM": "JPMorgan Chase & Co.", # 금융 기업 추가
-    "XOM": "Exxon Mobil" # 에너지 기업 추가
-}
-# 참고: Saudi Aramco (2222.SR)는 yfinance에서 접근이 어려울 수 있습니다.
-# Tesla는 시총 변동성이 커서 Top10에 들지 않을 수 있어 다른 기업으로 대체
+# 기본 목록은 common/market_panel.py의 TOP_TICKERS에 있습니다. (사전 적재 작업과 공유)
+top_tickers = dict(TOP_TICKERS)
+
+# 유니버스 모드: CSV 목록(기본: data/sp500_universe.csv)의 500여 개 티커 전체를 불러옵니다.
+@st.cache_data
+def get_universe(path):
+    return load_universe(path)
+
+# 티커 목록은 서버 경로를 직접 입력받지 않고, 데이터 디렉터리(data/) 아래의 *universe*.csv 중에서 고릅니다.
+universe_mode = st.sidebar.toggle("유니버스 모드 (S&P 500 규모)", value=False)
+if universe_mode:
+    universe_files = list_data_files((".csv",), contains="universe")
+    if universe_files:
+        default_file = os.path.basename(DEFAULT_UNIVERSE_CSV)
+        universe_file = st.sidebar.selectbox(
+            "티커 목록 CSV", universe_files,
+            index=universe_files.index(default_file) if default_file in universe_files else 0,
+        )
+        universe_csv = resolve_data_file(universe_file)
+        top_tickers = get_universe(universe_csv)
+    else:
+        st.sidebar.warning("데이터 디렉터리에 티커 목록 CSV(*universe*.csv)가 없어 기본 목록을 씁니다.")
+        universe_mode = False
 
 # 3개년 기간 설정 (오늘부터 3년 전까지)
 end_date = datetime.now()
-start_date = end_date - timedelta(days=3 * 365) # 대략 3년
+start_date = end_date - timedelta(days=HISTORY_DAYS) # 대략 3년
+
+PREWARM_SCHEDULE = os.environ.get("PRICE_PREWARM_SCHEDULE", DEFAULT_SCHEDULE)
+
+# 로컬 주가 캐시 (프로세스당 한 번 생성하여 모든 세션이 공유)
+@st.cache_resource
+def get_price_store():
+    store = PriceStore()
+    store.prune()  # 보존 기간이 지난 봉 정리
+    return store
+
+price_store = get_price_store()
+
+# 티커 .info 메타데이터 캐시 (프로세스 전체 공유, 필드별 TTL + 백그라운드 갱신)
+@st.cache_resource
+def get_metadata_provider():
+    provider = get_provider()
+    return MetadataCachingProvider(provider, MetadataCache(provider.info, store=get_price_store()))
+
+data_provider = get_metadata_provider()
 
-# 시가총액 데이터를 저장할 DataFrame 초기화
-market_cap_data = pd.DataFrame()
+# 이 세션의 티커 목록으로 만든 공유 패널 이름 (--- 1-1. 공유 패널 참고)
+panel_name = "universe-" + hashlib.sha1(universe_csv.encode("utf-8")).hexdigest()[:10] if universe_mode else "top10"
+
+with st.sidebar.expander("주가 캐시 관리"):
+    st.caption(f"보존 기간: {price_store.retention_days}일 · 저장 위치: `{price_store.path}`")
+    invalidate_target = st.selectbox("초기화할 티커", ["(전체)"] + list(top_tickers.keys()))
+    if st.button("캐시 초기화"):
+        price_store.invalidate(None if invalidate_target == "(전체)" else invalidate_target)
+        get_metadata_provider().cache.invalidate(None if invalidate_target == "(전체)" else invalidate_target)
+        # 이 세션이 보는 공유 패널도 내려야 다음 로딩 때 실제로 다시 수집합니다. (다른 유니버스의 패널은 그대로 둠)
+        unpublish_panel(panel_name)
+        st.success(f"{invalidate_target} 캐시를 초기화했습니다. 다음 로딩 때 전체 기간을 다시 받아옵니다.")
+
+# PRICE_PREWARM_IN_PROCESS=1 이면 이 서버 프로세스 안에서 사전 적재 스케줄러를 돌립니다.
+# (별도 프로세스로는 `python -m common.prewarm` 를 실행)
+if os.environ.get("PRICE_PREWARM_IN_PROCESS") == "1":
+    # 유니버스(CSV 파일)마다 별도 스케줄러를 두어, 세션이 고른 목록이 모두 적재되도록 합니다.
+    start_background_prewarmer(
+        list(top_tickers), price_store, schedule=PREWARM_SCHEDULE,
+        name=os.path.basename(universe_csv) if universe_mode else "top10",
+    )
+
+prewarm_info = prewarm_status(price_store, schedule=PREWARM_SCHEDULE)
+if prewarm_info.get("finished_at"):
+    st.sidebar.caption(
+        f"🔄 마지막 사전 적재: {datetime.fromtimestamp(prewarm_info['finished_at']):%Y-%m-%d %H:%M} "
+        f"(성공 {prewarm_info['ok']}, 실패 {len(prewarm_info['failed'])}) · "
+        f"다음 예정: {prewarm_info['next_run']:%m-%d %H:%M}"
+    )
+else:
+    st.sidebar.caption(f"🔄 사전 적재 기록 없음 · 다음 예정: {prewarm_info['next_run']:%m-%d %H:%M}")
+
+# 시가총액 패널을 만들 (종가, 발행 주식수) 모음
+market_cap_inputs = {}
 failed_tickers = []
+# 유니버스 모드에서는 티커별 경고가 수백 개가 될 수 있어 접힌 영역에 모아 표시합니다.
+fetch_log = st.expander("데이터 수집 경고") if universe_mode else st
 
 st.sidebar.header("데이터 로딩 중...")
 progress_bar = st.sidebar.progress(0)
 status_text = st.sidebar.empty()
 
+# --- 1-1. 공유 패널 ---
+# 다른 세션·서버 프로세스가 같은 조건(티커 목록, 기준일, 데이터 소스)으로 이미 게시한 패널이 있고
+# 주가 캐시 보존 기준(max_age_seconds) 안이면, 수집 없이 메모리 맵으로 열어 그대로 씁니다.
+@st.cache_resource
+def get_shared_panel_reader():
+    return SharedPanelReader()
+
+panel_key = hashlib.sha1(json.dumps(
+    [sorted(top_tickers), f"{end_date:%Y-%m-%d}", os.environ.get("STOCK_DATA_PROVIDER", "yfinance")]
+).encode("utf-8")).hexdigest()
+
+# 패널 이름별 분석 누적량 (프로세스 전체 공유, 새 봉만 증분 반영)
+@st.cache_resource
+def get_panel_analytics(name):
+    return PanelAnalytics()
+
+VOLATILITY_WINDOW_CHOICES = [5, 10, 20, 60, 120, 250]
+# 상관행렬 히트맵에 올릴 최대 기업 수 (최근 시가총액 상위). 500×500 행렬은 전송·렌더링이 무거움
+CORRELATION_MAX_COMPANIES = 50
+
+# 게시된 패널 버전별 날짜×순위 표 (N을 바꿔도 다시 만들지 않음). _panel은 해시하지 않습니다.
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_rank_table(name, version, _panel):
+    return RankTable(_panel)
+
+# 막대 경주 figure는 (버전, N, 간격)별로 보관합니다.
+@st.cache_resource
+def get_race_figure_cache():
+    return BoundedMemo(max_entries=16, max_bytes=64 * 1024 * 1024)
+
+RACE_FRAME_STEPS = {"월간 (21거래일)": 21, "주간 (5거래일)": 5, "분기 (63거래일)": 63}
+# 막대 경주는 모든 프레임을 한 번에 보내므로 프레임 수와 막대 수를 제한합니다.
+RACE_MAX_FRAMES = 60
+RACE_MAX_N = 20
+
+with trace.span("shared_panel_open"):
+    market_cap_data, shared_index = get_shared_panel_reader().get(
+        panel_name, key=panel_key, max_age_seconds=price_store.max_age_seconds
+    )
+
 # --- 2. yfinance를 사용하여 데이터 가져오기 및 시가총액 추정 ---
-total_tickers = len(top_tickers)
-for i, (ticker, company_name) in enumerate(top_tickers.items()):
-    status_text.text(f"Fetching data for {company_name} ({ticker})... ({i+1}/{total_tickers})")
-    progress_bar.progress((i + 1) / total_tickers)
+# 공유 패널이 없거나 오래됐을 때만 실행하고, 완성한 패널을 다음 세션·프로세스를 위해 게시합니다.
+if market_cap_data is None:
+    # 모든 티커의 발행 주식수(.info)와 주가(.history)를 제한된 스레드 풀에서 동시에 가져옵니다.
+    # STOCK_DATA_PROVIDER=fake 환경 변수로 네트워크 없이 가짜 데이터 소스를 쓸 수 있습니다.
+    total_tickers = len(top_tickers)
 
-    try:
-        ticker_obj = yf.Ticker(ticker)
+    def report_progress(done, total, ticker):
+        status_text.text(f"Fetched data for {top_tickers[ticker]} ({ticker})... ({done}/{total})")
+        progress_bar.progress(done / total)
 
-        # 1. 최근 발행 주식수(Shares Outstanding) 가져오기 (가장 큰 한계점)
+    with trace.span("fetch_all", tickers=total_tickers):
+        fetch_results = fetch_all(
+            top_tickers.keys(), start_date, end_date,
+            provider=data_provider, price_store=price_store, on_progress=report_progress
+        )
+    # 티커별 수집 시간은 작업 스레드에서 잰 값을 그대로 기록합니다.
+    for ticker, result in fetch_results.items():
+        if result.elapsed is not None:
+            trace.record("fetch_ticker", result.elapsed, ticker=ticker, ok=result.error is None)
+
+    for ticker, company_name in top_tickers.items():
+        result = fetch_results[ticker]
+        if result.error is not None:
+            fetch_log.error(f"Error fetching data for {company_name} ({ticker}): {result.error}")
+            failed_tickers.append(ticker)
+            continue
+
+        # 1. 최근 발행 주식수(Shares Outstanding) (가장 큰 한계점)
         # yfinance의 info에서 sharesOutstanding를 가져오지만, 이는 최신 값이며 과거 시점에는 적용되지 않음
         # 정확한 시가총액을 위해서는 각 날짜의 발행 주식수가 필요함
         # 여기서는 편의상 가장 최근의 sharesOutstanding를 과거 모든 주가에 곱하겠습니다.
-        shares_outstanding = ticker_obj.info.get('sharesOutstanding', None)
+        shares_outstanding = result.shares_outstanding
         if shares_outstanding is None:
-            # 기본적으로 info에서 가져오지 못하면 시총 정보에서 시도
-            shares_outstanding = ticker_obj.info.get('sharesOutstanding', None)
-            if shares_outstanding is None:
-                st.warning(f"Could not retrieve sharesOutstanding for {company_name} ({ticker}). Skipping.")
-                failed_tickers.append(ticker)
-                continue
-
-        # 2. 3년간의 과거 주가(종가) 데이터 가져오기
-        hist = ticker_obj.history(start=start_date, end=end_date)
-        if hist.empty:
-            st.warning(f"No historical data found for {company_name} ({ticker}). Skipping.")
+            fetch_log.warning(f"Could not retrieve sharesOutstanding for {company_name} ({ticker}). Skipping.")
             failed_tickers.append(ticker)
             continue
 
-        # 시가총액 추정 (종가 * 현재 발행 주식수)
-        # 이 시가총액은 '현재' 발행 주식수를 과거에 적용한 것이므로 정확하지 않음
-        estimated_market_cap = hist['Close'] * shares_outstanding
+        # 2. 3년간의 과거 주가(종가) 데이터
+        # 캐시에 있는 구간은 로컬에서 읽고, 마지막 캐시 날짜 이후의 봉만 새로 받아옵니다.
+        hist = result.history
+        if hist.empty:
+            fetch_log.warning(f"No historical data found for {company_name} ({ticker}). Skipping.")
+            failed_tickers.append(ticker)
+            continue
 
-        # 단위를 조 달러(Trillion USD)로 변환 (1조 = 1,000,000,000,000)
-        market_cap_data[company_name] = estimated_market_cap / 1_000_000_000_000
+        market_cap_inputs[company_name] = (hist, shares_outstanding)
 
-    except Exception as e:
-        st.error(f"Error fetching data for {company_name} ({ticker}): {e}")
-        failed_tickers.append(ticker)
-        continue
+    # 시가총액 추정 (종가 * 현재 발행 주식수)
+    # 이 시가총액은 '현재' 발행 주식수를 과거에 적용한 것이므로 정확하지 않음
+    # 통합 거래일 × 기업 float32 행렬을 한 번에 채우며, 단위는 조 달러(Trillion USD)입니다.
+    with trace.span("market_cap_panel"):
+        market_cap_data = build_market_cap_panel(market_cap_inputs)
+    panel_version = None
+    if not market_cap_data.empty:
+        with trace.span("shared_panel_publish"):
+            panel_version = publish_panel(market_cap_data, panel_name, key=panel_key, meta={"failed": failed_tickers})
+else:
+    # 게시한 쪽에서 실패한 티커 목록도 함께 보여 줍니다.
+    failed_tickers = list(shared_index["meta"].get("failed", []))
+    panel_version = shared_index["version"]
+    progress_bar.progress(1.0)
+    status_text.text(
+        f"공유 패널 사용: {datetime.fromtimestamp(shared_index['created_at']):%Y-%m-%d %H:%M} 게시본 "
+        f"({shared_index['shape'][0]}일 × {shared_index['shape'][1]}개 기업)"
+    )
 
 st.sidebar.success("데이터 로딩 완료!")
+with st.sidebar.expander("메타데이터 캐시 통계"):
+    metadata_stats = data_provider.cache.stats()
+    st.write(
+        f"적중 {metadata_stats['hits']} · 만료 후 적중 {metadata_stats['stale_hits']} · "
+        f"미적중 {metadata_stats['misses']} (적중률 {metadata_stats['hit_rate']:.0%})"
+    )
+    st.caption(
+        f"백그라운드 갱신 {metadata_stats['refreshes']} (실패 {metadata_stats['refresh_errors']}) · "
+        f"항목 {metadata_stats['size']}/{metadata_stats['max_entries']} · 제거 {metadata_stats['evictions']}"
+    )
 if failed_tickers:
     st.sidebar.warning(f"Failed to fetch data for: {', '.join(failed_tickers)}")
 
@@ -89,19 +240,48 @@ if market_cap_data.empty:
     st.error("모든 기업의 데이터를 가져오는 데 실패했습니다. 티커를 확인하거나 다시 시도해 주세요.")
 else:
     # --- 3. Plotly 그래프 생성 ---
-    fig = go.Figure()
-
-    for company in market_cap_data.columns:
-        fig.add_trace(go.Scatter(
-            x=market_cap_data.index,
-            y=market_cap_data[company],
-            mode='lines',
-            name=company,
-            hovertemplate=
-                '<b>%{data.name}</b><br>' +
-                '날짜: %{x|%Y-%m-%d}<br>' +
-                '시가총액: %{y:,.2f}조 달러<extra></extra>'
-        ))
+    # 차트 폭(픽셀)에 맞춰 trace당 점 개수를 제한하고, 점이 많으면 WebGL로 그립니다.
+    with st.sidebar.expander("차트 설정"):
+        chart_width_px = st.number_input("차트 폭 (픽셀)", min_value=300, max_value=4000, value=1200, step=100)
+        downsample_method = st.selectbox("다운샘플링", ["min/max", "LTTB", "없음"])
+        show_payload_debug = st.checkbox("디버그: 전송 크기 표시", value=False)
+
+    def make_line_figure(data, method, hovertemplate, scale=1.0):
+        # 열마다 선 하나. 점 개수는 차트 폭에 맞춰 줄이고, 전체 점이 많으면 WebGL로 그립니다.
+        max_points = max_points_for_width(chart_width_px)
+        values = data.to_numpy()
+        if method == "min/max":
+            indices = minmax_indices(values, max_points)
+        elif method == "LTTB":
+            indices = [lttb_indices(values[:, j], max_points) for j in range(values.shape[1])]
+        else:
+            indices = [np.flatnonzero(~np.isnan(values[:, j])) for j in range(values.shape[1])]
+
+        total_points = sum(len(idx) for idx in indices)
+        trace_type = go.Scattergl if total_points > WEBGL_POINT_THRESHOLD else go.Scatter
+
+        figure = go.Figure()
+        for j, name in enumerate(data.columns):
+            idx = indices[j]
+            figure.add_trace(trace_type(
+                x=data.index[idx],
+                y=values[idx, j] * scale,
+                mode='lines',
+                name=name,
+                hovertemplate=hovertemplate
+            ))
+        return figure, total_points, trace_type.__name__
+
+    def make_market_cap_figure(data, method):
+        return make_line_figure(
+            data, method,
+            '<b>%{data.name}</b><br>' +
+            '날짜: %{x|%Y-%m-%d}<br>' +
+            '시가총액: %{y:,.2f}조 달러<extra></extra>'
+        )
+
+    with trace.span("build_figure", method=downsample_method):
+        fig, shipped_points, trace_type_name = make_market_cap_figure(market_cap_data, downsample_method)
 
     # 레이아웃 설정
     fig.update_layout(
@@ -124,7 +304,175 @@ else:
         )
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    with trace.span("render_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+    if show_payload_debug:
+        # 원본(다운샘플링 없음)과 실제 전송한 figure JSON 크기를 비교합니다.
+        full_fig, full_points, _ = make_market_cap_figure(market_cap_data, "없음")
+        full_fig.update_layout(fig.layout)
+        shipped_bytes = len(fig.to_json().encode("utf-8"))
+        full_bytes = len(full_fig.to_json().encode("utf-8"))
+        st.sidebar.metric("전송 크기", f"{shipped_bytes / 1024:,.1f} KB", f"{shipped_bytes - full_bytes:+,} B (원본 {full_bytes / 1024:,.1f} KB)", delta_color="inverse")
+        st.sidebar.caption(f"점 개수: {shipped_points:,} / {full_points:,} · trace 종류: {trace_type_name}")
+
+    # --- 4. 수익률·변동성·낙폭·상관 분석 ---
+    # 패널 전체를 한 번에 계산하며, 같은 패널에 새 봉이 붙으면 늘어난 행만 반영합니다. (common/panel_analytics.py)
+    st.markdown("---")
+    st.header("수익률 · 변동성 · 낙폭 · 상관 분석")
+    analytics = get_panel_analytics(panel_name)
+    with trace.span("analytics_update"):
+        update_kind = analytics.update(market_cap_data)
+
+    control_cols = st.columns([1, 2])
+    volatility_windows = control_cols[0].multiselect(
+        "이동 변동성 창 (거래일)", VOLATILITY_WINDOW_CHOICES, default=list(DEFAULT_VOLATILITY_WINDOWS)
+    ) or list(DEFAULT_VOLATILITY_WINDOWS)
+    analysis_companies = control_cols[1].multiselect(
+        "차트에 표시할 기업", list(market_cap_data.columns), default=list(market_cap_data.columns[:5])
+    )
+    st.caption(
+        f"{len(analytics.dates):,}일 × {len(analytics.columns):,}개 기업 · "
+        f"갱신: {'전체 계산' if update_kind == 'full' else '증분 반영' if update_kind == 'append' else '변경 없음'} "
+        f"(전체 {analytics.full_rebuilds}회, 증분 {analytics.incremental_updates}회)"
+    )
+
+    # 탭은 숨겨진 차트까지 매 실행 전송하므로, 고른 보기 하나만 계산·전송합니다.
+    analysis_view = st.radio("보기", ["요약", "이동 변동성", "낙폭", "상관행렬"], horizontal=True)
+    percent_hover = "<b>%{data.name}</b><br>%{x|%Y-%m-%d}: %{y:.1f}%<extra></extra>"
+    if analysis_view == "요약":
+        with trace.span("analytics_summary"):
+            # 비율 값은 백분율로 바꿔 표시합니다.
+            st.dataframe(
+                analytics.summary(sorted(volatility_windows)) * 100,
+                column_config={name: st.column_config.NumberColumn(format="%.2f%%")
+                               for name in ["일간 수익률", "최대 낙폭"] + [f"변동성 {w}일" for w in sorted(volatility_windows)]},
+                use_container_width=True,
+            )
+            st.caption("변동성은 일간 수익률 표준편차를 연율화(√252)한 값이고, 최대 낙폭은 기간 내 최고점 대비 최저 비율입니다.")
+
+    elif analysis_view == "이동 변동성":
+        with trace.span("analytics_volatility"):
+            volatility_frames = [
+                analytics.rolling_volatility(window)[analysis_companies].add_suffix(f" ({window}일)")
+                for window in sorted(volatility_windows)
+            ]
+            volatility = volatility_frames[0].join(volatility_frames[1:])
+            volatility_fig, _, _ = make_line_figure(volatility, downsample_method, percent_hover, scale=100)
+            volatility_fig.update_layout(xaxis_title="날짜", yaxis_title="연율화 변동성 (%)", hovermode="x unified")
+            st.plotly_chart(volatility_fig, use_container_width=True)
+
+    elif analysis_view == "낙폭":
+        with trace.span("analytics_drawdown"):
+            drawdown_fig, _, _ = make_line_figure(
+                analytics.drawdown()[analysis_companies], downsample_method, percent_hover, scale=100
+            )
+            drawdown_fig.update_layout(xaxis_title="날짜", yaxis_title="최고점 대비 낙폭 (%)", hovermode="x unified")
+            st.plotly_chart(drawdown_fig, use_container_width=True)
+
+    else:
+        with trace.span("analytics_correlation"):
+            # 일간 수익률 상관계수 (두 기업이 함께 거래된 날만 사용). 최근 시가총액 상위 기업으로 제한합니다.
+            correlation = analytics.correlation()
+            if len(correlation) > CORRELATION_MAX_COMPANIES:
+                top_companies = market_cap_data.ffill().iloc[-1].nlargest(CORRELATION_MAX_COMPANIES).index
+                correlation = correlation.loc[top_companies, top_companies]
+                st.caption(f"최근 시가총액 상위 {CORRELATION_MAX_COMPANIES}개 기업만 표시합니다. (전체 {len(analytics.columns):,}개)")
+            correlation_fig = go.Figure(go.Heatmap(
+                z=np.round(correlation.to_numpy(dtype=np.float32), 3), x=correlation.columns, y=correlation.index,
+                zmin=-1, zmax=1, colorscale="RdBu", reversescale=True,
+                hovertemplate="%{y} · %{x}: %{z:.2f}<extra></extra>",
+            ))
+            correlation_fig.update_layout(height=max(500, min(1200, 12 * len(correlation))), yaxis_autorange="reversed")
+            st.plotly_chart(correlation_fig, use_container_width=True)
+
+    # --- 5. 날짜별 실제 Top-N ---
+    # 고정된 티커 목록이 아니라, 불러온 모든 기업을 거래일마다 시가총액 순으로 다시 골라 Top-N 진입·이탈을 보여 줍니다.
+    # (많은 기업 중에서 고르려면 사이드바의 유니버스 모드를 켭니다.)
+    st.markdown("---")
+    st.header("날짜별 실제 Top-N")
+    with trace.span("rank_table"):
+        rank_table = get_rank_table(panel_name, panel_version, market_cap_data)
+    rank_cols = st.columns([2, 1])
+    if rank_table.depth >= 2:
+        top_n = rank_cols[0].slider("N (거래일마다 상위 N개 기업)", 1, rank_table.depth, min(10, rank_table.depth))
+    else:
+        # 기업이 하나뿐이면 고를 N이 없습니다. (슬라이더는 최솟값과 최댓값이 같으면 만들 수 없음)
+        top_n = rank_table.depth
+    # 구성 변화 표가 기본이며, 차트와 막대 경주는 고를 때만 만들어 보냅니다.
+    topn_view = rank_cols[1].radio("보기", ["구성 변화", "Top-N 차트", "막대 경주"], key="topn_view")
+
+    if topn_view == "구성 변화":
+        with trace.span("topn_changes", n=top_n):
+            st.subheader(f"Top {top_n} 구성 변화")
+            st.dataframe(rank_table.changes(top_n), use_container_width=True, hide_index=True)
+
+    elif topn_view == "Top-N 차트":
+        with trace.span("topn_chart", n=top_n):
+            top_n_data = rank_table.top_n_frame(top_n)
+            topn_values = top_n_data.to_numpy()
+            topn_trace_type = go.Scattergl if np.count_nonzero(~np.isnan(topn_values)) > WEBGL_POINT_THRESHOLD else go.Scatter
+            topn_fig = go.Figure()
+            for j, company in enumerate(top_n_data.columns):
+                # Top-N 밖에 있던 날은 NaN이라 선이 끊겨 진입·이탈이 드러납니다.
+                topn_fig.add_trace(topn_trace_type(
+                    x=top_n_data.index, y=topn_values[:, j], mode="lines", name=company, connectgaps=False,
+                    hovertemplate="<b>%{data.name}</b><br>날짜: %{x|%Y-%m-%d}<br>시가총액: %{y:,.2f}조 달러<extra></extra>",
+                ))
+            topn_fig.update_layout(
+                title=f"거래일별 시가총액 상위 {top_n}개 기업 (기간 중 {len(top_n_data.columns)}개 기업이 진입)",
+                xaxis_title="날짜", yaxis_title="시가총액 (조 달러)", hovermode="x unified",
+            )
+            st.plotly_chart(topn_fig, use_container_width=True)
+
+    else:
+        race_step_label = st.selectbox("막대 경주 간격", list(RACE_FRAME_STEPS))
+        race_n = min(top_n, RACE_MAX_N)
+        # 기간이 길면 간격을 넓혀 프레임이 RACE_MAX_FRAMES개를 넘지 않게 합니다.
+        race_step = max(RACE_FRAME_STEPS[race_step_label], -(-len(rank_table.dates) // RACE_MAX_FRAMES))
+
+        def make_race_figure(n, step):
+            frames = rank_table.frames(n, step)
+            x_max = max((value for _, bars in frames for _, value in bars), default=1.0) * 1.1
+
+            def bars(entries):
+                # 1위가 맨 위에 오도록 뒤집어서 그립니다. 값 표시는 hover로 하고 막대 글자는 보내지 않습니다.
+                return go.Bar(x=[value for _, value in reversed(entries)], y=[name for name, _ in reversed(entries)],
+                              orientation="h", marker_color="#636EFA", hovertemplate="%{y}: %{x:,.2f}조 달러<extra></extra>")
+
+            figure = go.Figure(
+                data=[bars(frames[0][1])],
+                frames=[go.Frame(data=[bars(entries)], name=f"{date:%Y-%m-%d}") for date, entries in frames],
+            )
+            figure.update_layout(
+                xaxis=dict(range=[0, x_max], title="시가총액 (조 달러)"),
+                yaxis=dict(type="category"),
+                height=max(400, 28 * n + 160),
+                updatemenus=[dict(type="buttons", showactive=False, x=0, y=1.12, direction="left", buttons=[
+                    dict(label="▶ 재생", method="animate",
+                         args=[None, dict(frame=dict(duration=120, redraw=True), transition=dict(duration=0), fromcurrent=True)]),
+                    dict(label="⏸ 정지", method="animate",
+                         args=[[None], dict(frame=dict(duration=0, redraw=False), mode="immediate")]),
+                ])],
+                sliders=[dict(active=0, currentvalue=dict(prefix="날짜: "), steps=[
+                    dict(label=f"{date:%Y-%m-%d}", method="animate",
+                         args=[[f"{date:%Y-%m-%d}"], dict(frame=dict(duration=0, redraw=True), mode="immediate")])
+                    for date, _ in frames
+                ])],
+            )
+            return figure, len(frames) * n
+
+        with trace.span("bar_race", n=race_n):
+            race_fig, _ = get_race_figure_cache().get_or_compute(
+                (panel_name, panel_version, race_n, race_step),
+                lambda: make_race_figure(race_n, race_step),
+                sizeof=lambda item: item[1] * 200,  # 막대 하나당 대략 200바이트
+            )
+            st.subheader(f"시가총액 Top {race_n} 막대 경주")
+            if race_n < top_n or race_step > RACE_FRAME_STEPS[race_step_label]:
+                st.caption(f"막대 경주는 상위 {RACE_MAX_N}개, 프레임 {RACE_MAX_FRAMES}개까지만 그립니다. "
+                           f"(이번 간격: {race_step}거래일)")
+            st.plotly_chart(race_fig, use_container_width=True)
 
     st.markdown("---")
     st.header("참고 사항:")
@@ -133,3 +481,7 @@ else:
     * **시가총액 추정의 한계:** `yfinance`는 과거 시점별 정확한 발행 주식수 데이터를 직접 제공하지 않습니다. 여기서는 **가장 최근 시점의 발행 주식수 데이터를 모든 과거 주가에 곱하여 시가총액을 계산**했으므로, 실제 과거의 정확한 시가총액과는 차이가 있을 수 있습니다. 발행 주식수는 기업의 자사주 매입, 주식 발행 등으로 변동됩니다.
     * **티커 및 순위 변동성:** Top 10 기업의 목록과 순위는 시장 상황에 따라 실시간으로 변동됩니다. 제공된 티커 목록은 작성 시점의 대략적인 상위 기업을 기준으로 합니다.
     """)
+
+trace.finish()
+if debug_enabled():
+    render_debug_sidebar(trace)
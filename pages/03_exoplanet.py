@@ -1,9 +1,24 @@
+import os
 import streamlit as st
 import numpy as np
+import plotly.colors
 import plotly.graph_objects as go
-import time # 애니메이션을 위한 time 모듈
+import streamlit.components.v1 as components
+import time # 계산 시간 측정
+from common.chromatic import chromatic_light_curves
+from common.data_files import list_data_files, resolve_data_file
+from common.downsample import minmax_indices
+from common.lightcurve_io import bin_light_curve, fit_radius_ratio, peek_columns, transit_model
+from common.memo import BoundedMemo
+from common.multiplanet import (
+    AU_KM, PLANET_COLUMNS, R_EARTH_KM, default_planet_table, multi_planet_flux, orbital_periods_days, sky_positions
+)
+from common.tracing import RunTrace, debug_enabled, render_debug_sidebar
+from common.transit import adaptive_theta, contact_angles, relative_flux, sweep_transit_grid, verify_against_scalar
 
 st.set_page_config(layout="wide")
+# 이번 실행의 단계별 시간 (밝기 계산·figure 생성·애니메이션 등, 캐시 적중이면 짧게 기록됨)
+trace = RunTrace("exoplanet")
 st.title("식현상 시뮬레이션: 항성 밝기 변화")
 
 st.sidebar.header("시뮬레이션 설정")
@@ -36,66 +51,151 @@ star_temperature_thousand_k = st.sidebar.slider(
 )
 star_temperature_k = star_temperature_thousand_k * 1000
 
-# --- 2. 밝기 변화 계산 함수 ---
-def calculate_flux_change(star_radius_km, planet_radius_km, distance_from_center_of_star):
-    R_s = star_radius_km
-    R_p = planet_radius_km
-    d = distance_from_center_of_star
-
-    if d >= R_s + R_p:
-        return 0.0
-    elif d <= abs(R_s - R_p):
-        if R_p <= R_s:
-            return (np.pi * R_p**2) / (np.pi * R_s**2)
-        else:
-            return 1.0
-
-    else:
-        arg1_arccos = (d**2 + R_s**2 - R_p**2) / (2 * d * R_s)
-        arg2_arccos = (d**2 + R_p**2 - R_s**2) / (2 * d * R_p)
+num_steps = st.sidebar.number_input(
+    "시뮬레이션 시간 단계 수",
+    min_value=100, max_value=1_000_000, value=200, step=100
+)
+adaptive_sampling = st.sidebar.checkbox(
+    "적응형 샘플링 (식현상 구간에 표본 집중)", value=True
+)
 
-        arg1_arccos = np.clip(arg1_arccos, -1.0, 1.0)
-        arg2_arccos = np.clip(arg2_arccos, -1.0, 1.0)
+# --- 2. 밝기 변화 계산 함수 ---
+# 스칼라 calculate_flux_change와 배열 전체를 한 번에 계산하는 relative_flux는 common/transit.py에 있습니다.
 
-        alpha = np.arccos(arg1_arccos)
-        beta = np.arccos(arg2_arccos)
+# 계산 결과 메모이제이션: 같은 슬라이더 값 조합으로 돌아오면 배열과 figure를 다시 만들지 않습니다.
+# (프로세스 전체에서 공유하며, 항목 수와 추정 메모리 사용량 상한을 넘으면 오래된 항목부터 제거)
+@st.cache_resource
+def get_simulation_memo():
+    return BoundedMemo(max_entries=64, max_bytes=256 * 1024 * 1024)
 
-        area_overlap = R_s**2 * alpha + R_p**2 * beta - 0.5 * np.sqrt(
-            (-d + R_s + R_p) * (d + R_s - R_p) * (d - R_s + R_p) * (d + R_s + R_p)
-        )
-        return area_overlap / (np.pi * R_s**2)
+simulation_memo = get_simulation_memo()
+curve_key = (planet_radius_km, star_radius_km, distance_km, num_steps, adaptive_sampling)
 
 # --- 시뮬레이션 계산 ---
-num_steps = 200
-theta = np.linspace(0, 2 * np.pi, num_steps)
-x_orbit = distance_km * np.cos(theta)
-y_orbit = distance_km * np.sin(theta)
+def compute_light_curve():
+    # 적응형 샘플링: 반경과 거리로 접촉점을 해석적으로 구해, 밝기가 변하는 식현상 구간에 표본을 몰아 둡니다.
+    if adaptive_sampling:
+        theta = adaptive_theta(star_radius_km, planet_radius_km, distance_km, num_steps)
+    else:
+        theta = np.linspace(0, 2 * np.pi, num_steps)
 
-flux_changes = []
-for i in range(num_steps):
     # 행성이 항성 앞을 지나갈 때, 항성 중심으로부터의 투영 거리 (x축으로 지나간다고 가정)
-    distance_from_center_of_star_for_calc = abs(x_orbit[i])
+    # 겹침 없음 / 완전 겹침 / 부분 겹침 구간을 마스크로 나눠 모든 단계를 한 번에 계산합니다.
+    flux_changes = relative_flux(star_radius_km, planet_radius_km, distance_km * np.cos(theta))
+    return theta, flux_changes
 
-    if distance_from_center_of_star_for_calc < (star_radius_km + planet_radius_km):
-        flux_change_ratio = calculate_flux_change(star_radius_km, planet_radius_km, distance_from_center_of_star_for_calc)
-        flux_changes.append(1 - flux_change_ratio)
-    else:
-        flux_changes.append(1.0)
+with trace.span("flux_compute", num_steps=num_steps):
+    theta, flux_changes = simulation_memo.get_or_compute(("curve",) + curve_key, compute_light_curve)
+x_orbit = distance_km * np.cos(theta)
 
-time_steps = np.linspace(0, 1, num_steps)
+with st.sidebar.expander("엔진 검증"):
+    # 궤도 위의 표본 위치와 경계값에서 벡터화 결과를 원래 스칼라 함수와 비교합니다.
+    sample = np.abs(x_orbit[np.linspace(0, len(x_orbit) - 1, min(len(x_orbit), 2000)).astype(int)])
+    edges = np.array([0.0, abs(star_radius_km - planet_radius_km), star_radius_km + planet_radius_km])
+    agrees, max_error = verify_against_scalar(star_radius_km, planet_radius_km, np.concatenate([sample, edges]))
+    st.write(f"{'✅ 일치' if agrees else '❌ 불일치'} (최대 절대 오차 {max_error:.2e})")
 
 # --- 3. Plotly 그래프 출력 ---
 st.header("항성 밝기 변화 그래프")
 
-fig_flux = go.Figure(
-    data=go.Scatter(x=time_steps, y=flux_changes, mode='lines', name='상대 밝기'),
-    layout=go.Layout(
-        title='항성 밝기 변화 곡선',
-        xaxis_title='시간 (상대적)',
-        yaxis_title='상대 밝기',
-        yaxis_range=[0.0, 1.1]
+def build_flux_figure():
+    # 표본 간격이 고르지 않을 수 있으므로 시간 축은 궤도 각에서 직접 구합니다.
+    time_steps = theta / (2 * np.pi)
+
+    # 단계 수가 많아도 차트로 보내는 점은 구간별 최솟값·최댓값만 남겨 4,000개 이하로 유지합니다.
+    flux_plot_idx = minmax_indices(flux_changes[:, None], 4000)[0]
+    return go.Figure(
+        data=go.Scatter(x=time_steps[flux_plot_idx], y=flux_changes[flux_plot_idx], mode='lines', name='상대 밝기'),
+        layout=go.Layout(
+            title='항성 밝기 변화 곡선',
+            xaxis_title='시간 (상대적)',
+            yaxis_title='상대 밝기',
+            yaxis_range=[0.0, 1.1]
+        )
     )
-)
+
+def figure_bytes(figure):
+    return len(figure.to_json().encode("utf-8"))
+
+# figure는 직렬화된 JSON 크기를 메모리 사용량으로 봅니다.
+with trace.span("flux_figure"):
+    fig_flux = simulation_memo.get_or_compute(("flux_fig",) + curve_key, build_flux_figure, sizeof=figure_bytes)
+
+# 관측 광도 곡선: 큰 표를 나눠 읽으며 위상을 접고 구간 평균한 뒤 시뮬레이션 곡선 위에 겹쳐 그립니다.
+with st.sidebar.expander("관측 광도 곡선 겹쳐 보기"):
+    observed_types = ["csv", "tsv", "txt", "dat", "tbl", "fits", "fit"]
+    observed_upload = st.file_uploader("광도 곡선 파일 (CSV/TSV/FITS)", type=observed_types)
+    # 업로드 한도를 넘는 큰 파일은 서버 경로를 직접 받지 않고, 데이터 디렉터리(data/)에 둔 파일 중에서 고릅니다.
+    observed_file = st.selectbox(
+        "또는 서버 데이터 파일 (업로드 한도를 넘는 큰 파일)",
+        ["(선택 안 함)"] + list_data_files(tuple("." + t for t in observed_types)),
+    )
+    observed_path = resolve_data_file(observed_file) if observed_file != "(선택 안 함)" else None
+    observed_source = observed_upload if observed_upload is not None else observed_path
+
+    if observed_source is not None:
+        is_fits = str(getattr(observed_source, "name", observed_source)).lower().endswith((".fits", ".fit"))
+        try:
+            columns = None if is_fits else peek_columns(observed_source)
+        except Exception as e:
+            st.error(f"관측 광도 곡선을 읽지 못했습니다: {e}")
+            observed_source = None
+
+    if observed_source is not None:
+        if is_fits:
+            time_column = st.text_input("시간 열 이름", value="TIME")
+            flux_column = st.text_input("밝기 열 이름", value="PDCSAP_FLUX")
+        else:
+            time_column = st.selectbox("시간 열", columns, index=next((i for i, c in enumerate(columns) if "time" in c.lower()), 0))
+            flux_column = st.selectbox("밝기 열", columns, index=next((i for i, c in enumerate(columns) if "flux" in c.lower()), min(1, len(columns) - 1)))
+        observed_period = st.number_input("공전 주기 (시간 열과 같은 단위)", min_value=1e-4, value=1.0, format="%.6f")
+        observed_epoch = st.number_input("식현상 중심 시각 (epoch)", value=0.0, format="%.6f")
+        observed_bins = st.select_slider("위상 구간 수", options=[100, 200, 500, 1000, 2000, 5000], value=500)
+        run_fit = st.checkbox("반경비(R_p/R_s) 적합", value=False)
+
+if observed_source is not None:
+    if observed_upload is not None:
+        source_id = ("upload", observed_upload.file_id)
+    else:
+        source_id = ("path", observed_path, os.path.getmtime(observed_path))
+
+    def load_observed():
+        if hasattr(observed_source, "seek"):
+            observed_source.seek(0)
+        binner = bin_light_curve(observed_source, time_column, flux_column, observed_period, observed_epoch, n_bins=observed_bins)
+        return binner.result() + (binner.rows,)
+
+    try:
+        obs_phase, obs_flux, obs_err, obs_counts, obs_rows = simulation_memo.get_or_compute(
+            ("observed",) + source_id + (time_column, flux_column, observed_period, observed_epoch, observed_bins),
+            load_observed
+        )
+    except Exception as e:
+        st.error(f"관측 광도 곡선을 읽지 못했습니다: {e}")
+    else:
+        # 시뮬레이션 곡선에서 식현상 중심은 시간 0.25이므로 위상 0을 그 위치에 맞춥니다.
+        fig_flux = go.Figure(fig_flux)
+        fig_flux.add_trace(go.Scatter(
+            x=np.mod(obs_phase + 0.25, 1.0), y=obs_flux, mode='markers', name=f'관측 (구간 평균, {obs_rows:,}행)',
+            marker=dict(size=4, color='black'),
+            error_y=dict(type='data', array=obs_err, visible=True, thickness=0.5)
+        ))
+        if run_fit:
+            a_over_rs = distance_km / star_radius_km
+            fitted_k, fit_chi2, fit_reduced_chi2, _ = simulation_memo.get_or_compute(
+                ("fit",) + source_id + (time_column, flux_column, observed_period, observed_epoch, observed_bins, a_over_rs),
+                lambda: fit_radius_ratio(obs_phase, obs_flux, obs_err, a_over_rs)
+            )
+            model_time = np.linspace(0, 1, 4001)
+            fig_flux.add_trace(go.Scatter(
+                x=model_time, y=transit_model(np.mod(model_time - 0.25 + 0.5, 1.0) - 0.5, fitted_k, a_over_rs),
+                mode='lines', name=f'적합 모델 (k={fitted_k:.4f})', line=dict(color='red', dash='dash')
+            ))
+            st.info(
+                f"적합 결과: R_p/R_s = **{fitted_k:.4f}** → 현재 항성 반경 기준 행성 반경 "
+                f"{fitted_k * star_radius_km / R_earth:.2f} R⊕ (a/R_s = {a_over_rs:.1f}, 축소 χ² = {fit_reduced_chi2:.2f})"
+            )
+
 st.plotly_chart(fig_flux, use_container_width=True)
 
 # --- 4. 애니메이션 출력 ---
@@ -103,78 +203,152 @@ st.plotly_chart(fig_flux, use_container_width=True)
 st.markdown("---") # 여기를 수정했습니다.
 st.header("행성의 공전 애니메이션")
 
-# 애니메이션을 위한 Plotly Figure 생성
-fig_animation = go.Figure()
-
-# 항성 그리기
-fig_animation.add_trace(go.Scatter(
-    x=[0], y=[0], mode='markers',
-    marker=dict(size=star_radius_km / R_sun * 20, color='orange', symbol='circle'),
-    name='항성'
-))
-
-# 행성 궤도 그리기
-fig_animation.add_trace(go.Scatter(
-    x=x_orbit, y=y_orbit, mode='lines',
-    line=dict(color='gray', dash='dot'),
-    name='행성 궤도'
-))
-
-# 행성 초기 위치 설정 (애니메이션 프레임에 사용될 데이터)
-# Plotly 애니메이션을 위한 frames 준비
-frames = []
-for i in range(num_steps):
-    frame = go.Frame(data=[
-        go.Scatter(
-            x=[0], y=[0], mode='markers',
-            marker=dict(size=star_radius_km / R_sun * 20, color='orange', symbol='circle')
-        ),
-        go.Scatter(
-            x=[x_orbit[i]], y=[y_orbit[i]], mode='markers',
-            marker=dict(size=planet_radius_km / R_earth * 10, color='blue', symbol='circle')
-        )
-    ], name=str(i))
-    frames.append(frame)
-
-fig_animation.frames = frames
-
-# 애니메이션 버튼 추가
-fig_animation.update_layout(
-    title='행성 공전 궤도 시뮬레이션',
-    xaxis_title='X (km)',
-    yaxis_title='Y (km)',
-    xaxis_range=[-distance_km * 1.2, distance_km * 1.2],
-    yaxis_range=[-distance_km * 1.2, distance_km * 1.2],
-    autosize=False,
-    width=600,
-    height=600,
-    showlegend=True,
-    updatemenus=[{
-        'buttons': [
-            {
-                'args': [None, {'frame': {'duration': 50, 'redraw': True}, 'fromcurrent': True, 'transition': {'duration': 0, 'easing': 'linear'}}],
-                'label': 'Play',
-                'method': 'animate'
-            },
-            {
-                'args': [[None], {'frame': {'duration': 0, 'redraw': True}, 'mode': 'immediate', 'transition': {'duration': 0}}],
-                'label': 'Pause',
-                'method': 'animate'
-            }
-        ],
-        'direction': 'left',
-        'pad': {'r': 10, 't': 87},
-        'showactive': False,
-        'type': 'buttons',
-        'x': 0.1,
-        'xanchor': 'right',
-        'y': 0,
-        'yanchor': 'top'
-    }]
+# 경량 모드: 항성·궤도는 한 번만 보내고, 각 프레임은 행성 trace(인덱스 2)의 위치만 갱신합니다.
+# 기존 모드: 매 프레임 항성까지 다시 보내고 redraw로 전체를 다시 그립니다. (비교용)
+animation_mode = st.sidebar.radio("애니메이션 모드", ["경량 (행성만 갱신)", "기존 (전체 재전송)"])
+lean_animation = animation_mode.startswith("경량")
+if lean_animation:
+    target_payload_kb = st.sidebar.slider("애니메이션 목표 전송 크기 (KB)", min_value=10, max_value=500, value=60, step=10)
+    loop_seconds = st.sidebar.slider("한 바퀴 재생 시간 (초)", min_value=2, max_value=30, value=10)
+
+# 애니메이션 프레임과 궤도 선은 밝기 계산 표본과 별개로 고르게 나눈 고정 개수의 각을 사용합니다.
+orbit_theta = np.linspace(0, 2 * np.pi, 1000)
+star_marker = dict(size=star_radius_km / R_sun * 20, color='orange', symbol='circle')
+planet_marker = dict(size=planet_radius_km / R_earth * 10, color='blue', symbol='circle')
+
+def build_orbit_animation(lean, num_frames=200, frame_duration_ms=50):
+    # 애니메이션을 위한 Plotly Figure 생성
+    figure = go.Figure()
+
+    # 항성 그리기
+    figure.add_trace(go.Scatter(x=[0], y=[0], mode='markers', marker=star_marker, name='항성'))
+
+    # 행성 궤도 그리기
+    figure.add_trace(go.Scatter(
+        x=np.round(distance_km * np.cos(orbit_theta)), y=np.round(distance_km * np.sin(orbit_theta)), mode='lines',
+        line=dict(color='gray', dash='dot'),
+        name='행성 궤도'
+    ))
+
+    anim_theta = np.linspace(0, 2 * np.pi, num_frames, endpoint=not lean)
+    anim_x = np.round(distance_km * np.cos(anim_theta), 1)
+    anim_y = np.round(distance_km * np.sin(anim_theta), 1)
+
+    # Plotly 애니메이션을 위한 frames 준비
+    if lean:
+        # 행성 초기 위치를 기본 trace로 넣고, 프레임은 이 trace의 좌표만 바꿉니다.
+        figure.add_trace(go.Scatter(x=[anim_x[0]], y=[anim_y[0]], mode='markers', marker=planet_marker, name='행성'))
+        frames = [
+            go.Frame(data=[go.Scatter(x=[anim_x[i]], y=[anim_y[i]])], traces=[2], name=str(i))
+            for i in range(num_frames)
+        ]
+    else:
+        frames = []
+        for i in range(num_frames):
+            frame = go.Frame(data=[
+                go.Scatter(x=[0], y=[0], mode='markers', marker=star_marker),
+                go.Scatter(x=[anim_x[i]], y=[anim_y[i]], mode='markers', marker=planet_marker)
+            ], name=str(i))
+            frames.append(frame)
+    figure.frames = frames
+
+    # 애니메이션 버튼 추가
+    redraw = not lean
+    figure.update_layout(
+        title='행성 공전 궤도 시뮬레이션',
+        xaxis_title='X (km)',
+        yaxis_title='Y (km)',
+        xaxis_range=[-distance_km * 1.2, distance_km * 1.2],
+        yaxis_range=[-distance_km * 1.2, distance_km * 1.2],
+        autosize=False,
+        width=600,
+        height=600,
+        showlegend=True,
+        updatemenus=[{
+            'buttons': [
+                {
+                    'args': [None, {'frame': {'duration': frame_duration_ms, 'redraw': redraw}, 'fromcurrent': True, 'transition': {'duration': 0, 'easing': 'linear'}}],
+                    'label': 'Play',
+                    'method': 'animate'
+                },
+                {
+                    'args': [[None], {'frame': {'duration': 0, 'redraw': redraw}, 'mode': 'immediate', 'transition': {'duration': 0}}],
+                    'label': 'Pause',
+                    'method': 'animate'
+                }
+            ],
+            'direction': 'left',
+            'pad': {'r': 10, 't': 87},
+            'showactive': False,
+            'type': 'buttons',
+            'x': 0.1,
+            'xanchor': 'right',
+            'y': 0,
+            'yanchor': 'top'
+        }]
+    )
+    return figure
+
+def plan_lean_frames(target_bytes, loop_seconds, min_frames=24, max_frames=720):
+    # 프레임 1개와 프레임 없는 기본 figure의 크기로 목표 전송 크기에 맞는 프레임 수를 정합니다.
+    one_frame = figure_bytes(build_orbit_animation(True, num_frames=1))
+    per_frame = figure_bytes(build_orbit_animation(True, num_frames=2)) - one_frame
+    base_bytes = one_frame - per_frame
+    num_frames = int(np.clip((target_bytes - base_bytes) // max(per_frame, 1), min_frames, max_frames))
+    # 한 바퀴 재생 시간을 유지하도록 프레임 간격을 맞춥니다. (브라우저 한계인 약 60fps 이하)
+    frame_duration_ms = max(16, int(round(loop_seconds * 1000 / num_frames)))
+    return num_frames, frame_duration_ms
+
+def build_selected_animation():
+    if lean_animation:
+        num_frames, frame_duration_ms = plan_lean_frames(target_payload_kb * 1024, loop_seconds)
+        figure = build_orbit_animation(True, num_frames, frame_duration_ms)
+    else:
+        num_frames, frame_duration_ms = 200, 50
+        figure = build_orbit_animation(False)
+    return figure, num_frames, frame_duration_ms, figure_bytes(figure)
+
+animation_key = (planet_radius_km, star_radius_km, distance_km, animation_mode) + (
+    (target_payload_kb, loop_seconds) if lean_animation else ()
 )
+with trace.span("animation_figure", mode=animation_mode):
+    fig_animation, num_frames, frame_duration_ms, current_bytes = simulation_memo.get_or_compute(
+        ("animation",) + animation_key, build_selected_animation, sizeof=lambda result: result[3]
+    )
 
 st.plotly_chart(fig_animation, use_container_width=True)
 
+with st.expander("애니메이션 전송 크기 · 프레임 속도 측정"):
+    # 같은 설정에서 기존 방식과 경량 방식의 직렬화된 figure 크기를 비교합니다.
+    legacy_bytes = simulation_memo.get_or_compute(
+        ("legacy_animation_bytes", planet_radius_km, star_radius_km, distance_km),
+        lambda: figure_bytes(build_orbit_animation(False))
+    )
+    st.write(
+        f"현재 figure: **{current_bytes / 1024:,.1f} KB** ({num_frames}프레임, {frame_duration_ms}ms 간격, "
+        f"목표 {1000 / frame_duration_ms:.0f}fps) · 기존 방식: {legacy_bytes / 1024:,.1f} KB (200프레임, 50ms 간격)"
+    )
+    if st.checkbox("브라우저에서 실제 프레임 속도 측정"):
+        # plotly_animatingframe 이벤트 간격으로 클라이언트에서 그려진 프레임 속도를 계산해 표시합니다.
+        fps_script = '''
+            var gd = document.getElementById('{plot_id}');
+            var count = 0, start = null;
+            gd.on('plotly_animatingframe', function() {
+                var now = performance.now();
+                if (start === null) { start = now; }
+                count += 1;
+                var out = document.getElementById('fps-out');
+                if (out && now > start) {
+                    out.textContent = '측정된 프레임 속도: ' + (1000 * (count - 1) / (now - start)).toFixed(1) + ' fps (' + count + '프레임)';
+                }
+            });
+        '''
+        html = fig_animation.to_html(include_plotlyjs='cdn', full_html=False, post_script=fps_script)
+        components.html(
+            html + '<div id="fps-out" style="font-family:sans-serif">Play를 누르면 측정을 시작합니다.</div>',
+            height=660
+        )
+
 # `---`를 Streamlit의 마크다운 구분자로 변경
 st.markdown("---") # 여기를 수정했습니다.
 st.header("항성 정보")
@@ -187,4 +361,176 @@ star_surface_area = 4 * np.pi * (star_radius_km * 1000)**2 # m^2
 star_luminosity = star_surface_area * sigma * (star_temperature_k)**4 # W
 
 st.write(f"**항성 광도 (예상):** {star_luminosity:.2e} W")
-st.write("*(참고: 항성 광도는 밝기 변화 계산에 직접 사용되지는 않지만, 항성의 물리량을 이해하는 데 도움을 줍니다.)*")
+st.write("*(참고: 위의 광도 곡선은 균일한 원반을 가정하므로 온도를 쓰지 않습니다. 온도에 따른 파장별 주연 감광은 사이드바의 '파장별(다색) 식현상 모드'에서 볼 수 있습니다.)*")
+
+# --- 5. 파라미터 스윕 ---
+# 행성 반경 × 항성 반경 격자 전체의 광도 곡선을 한 번의 브로드캐스팅 계산으로 구해
+# 식현상 깊이와 지속 시간을 열지도로 보여줍니다. (현재 거리 설정 사용)
+sweep_mode = st.sidebar.checkbox("파라미터 스윕 모드", value=False)
+if sweep_mode:
+    st.markdown("---")
+    st.header("파라미터 스윕: 식현상 깊이 · 지속 시간")
+
+    sweep_cols = st.columns(4)
+    sweep_grid_size = sweep_cols[0].select_slider("격자 크기", options=[20, 50, 100, 200], value=100)
+    sweep_samples = sweep_cols[1].select_slider("격자점당 시간 표본 수", options=[100, 250, 500, 1000, 2000], value=1000)
+    sweep_impact = sweep_cols[2].slider("충돌 변수 b (항성 반경 단위)", min_value=0.0, max_value=1.5, value=0.0, step=0.05)
+    sweep_log_depth = sweep_cols[3].checkbox("깊이를 로그 스케일로", value=True)
+
+    sweep_planet_earth = np.linspace(0.1, 20.0, sweep_grid_size)
+    sweep_star_sun = np.linspace(0.1, 10.0, sweep_grid_size)
+
+    def compute_sweep():
+        started = time.perf_counter()
+        depth, duration = sweep_transit_grid(
+            sweep_planet_earth * R_earth, sweep_star_sun * R_sun, distance_km,
+            impact_parameters=[sweep_impact], num_samples=sweep_samples
+        )
+        return depth[:, :, 0], duration[:, :, 0], time.perf_counter() - started
+
+    with trace.span("sweep_compute", grid=sweep_grid_size):
+        sweep_depth, sweep_duration, sweep_seconds = simulation_memo.get_or_compute(
+            ("sweep", distance_km, sweep_grid_size, sweep_samples, sweep_impact), compute_sweep
+        )
+    st.caption(
+        f"{sweep_grid_size}×{sweep_grid_size} 격자 × {sweep_samples:,}개 시간 표본 = "
+        f"{sweep_grid_size**2 * sweep_samples:,}회 밝기 계산 · {sweep_seconds:.2f}초"
+    )
+
+    depth_values = np.log10(np.where(sweep_depth > 0, sweep_depth, np.nan)) if sweep_log_depth else sweep_depth
+    heatmap_axes = dict(xaxis_title='항성 반경 (태양 반경)', yaxis_title='행성 반경 (지구 반경)')
+    depth_col, duration_col = st.columns(2)
+    depth_col.plotly_chart(go.Figure(
+        data=go.Heatmap(
+            x=sweep_star_sun, y=sweep_planet_earth, z=depth_values, colorscale='Viridis',
+            colorbar=dict(title='log10(깊이)' if sweep_log_depth else '깊이'),
+            hovertemplate='항성 %{x:.2f} R☉<br>행성 %{y:.2f} R⊕<br>값 %{z:.4g}<extra></extra>'
+        ),
+        layout=go.Layout(title='식현상 깊이 (최대 가림 비율)', **heatmap_axes)
+    ), use_container_width=True)
+    duration_col.plotly_chart(go.Figure(
+        data=go.Heatmap(
+            x=sweep_star_sun, y=sweep_planet_earth, z=sweep_duration * 100, colorscale='Magma',
+            colorbar=dict(title='% 주기'),
+            hovertemplate='항성 %{x:.2f} R☉<br>행성 %{y:.2f} R⊕<br>%{z:.3f}% 주기<extra></extra>'
+        ),
+        layout=go.Layout(title='식현상 지속 시간 (공전 주기 대비 %)', **heatmap_axes)
+    ), use_container_width=True)
+
+# --- 6. 다중 행성계 ---
+# 행성 표(반경, 궤도 장반경, 이심률, 경사각, 초기 위상)로 모든 행성 × 모든 시각의 케플러 궤도를 한 번에 풀고,
+# 겹치는 식현상까지 합친 하나의 광도 곡선을 그립니다. (항성 반경은 위 설정 사용)
+multi_planet_mode = st.sidebar.checkbox("다중 행성계 모드", value=False)
+if multi_planet_mode:
+    st.markdown("---")
+    st.header("다중 행성계 광도 곡선")
+
+    planet_table = st.data_editor(default_planet_table(), num_rows="dynamic", use_container_width=True, key="planet_table")
+    multi_cols = st.columns(3)
+    star_mass_sun = multi_cols[0].number_input("항성 질량 (태양 질량)", min_value=0.05, max_value=20.0, value=1.0, step=0.05)
+    span_days = multi_cols[1].number_input("관측 기간 (일)", min_value=1.0, max_value=3650.0, value=60.0, step=1.0)
+    multi_steps = multi_cols[2].select_slider("시간 단계 수", options=[1_000, 10_000, 100_000, 300_000], value=100_000)
+
+    planets = planet_table.dropna(subset=PLANET_COLUMNS[1:])
+    planets = planets[(planets["이심률"] >= 0) & (planets["이심률"] < 1) & (planets["궤도 장반경 (AU)"] > 0)]
+
+    def compute_multi_planet():
+        started = time.perf_counter()
+        periods = orbital_periods_days(planets["궤도 장반경 (AU)"], star_mass_sun)
+        times = np.linspace(0, span_days, multi_steps)
+        x, y, z = sky_positions(
+            times, planets["궤도 장반경 (AU)"].to_numpy() * AU_KM, planets["이심률"], planets["궤도 경사각 (°)"],
+            planets["초기 위상 (°)"], periods
+        )
+        flux, blocked = multi_planet_flux(star_radius_km, planets["반경 (R⊕)"].to_numpy() * R_EARTH_KM, x, y, z)
+        # 행성별 요약: 식현상 횟수(가림이 시작된 횟수)와 최대 깊이
+        starts = np.diff((blocked > 0).astype(np.int8), axis=1, prepend=0) == 1
+        summary = {"주기 (일)": periods, "식현상 횟수": starts.sum(axis=1), "최대 깊이": blocked.max(axis=1)}
+        return times, flux, summary, time.perf_counter() - started
+
+    if planets.empty:
+        st.warning("유효한 행성이 없습니다. 표를 확인해 주세요.")
+    else:
+        table_key = tuple(map(tuple, planets[PLANET_COLUMNS[1:]].to_numpy().tolist()))
+        with trace.span("multi_planet_compute", planets=len(planets)):
+            multi_times, multi_flux, multi_summary, multi_seconds = simulation_memo.get_or_compute(
+                ("multi_planet", star_radius_km, star_mass_sun, span_days, multi_steps, table_key), compute_multi_planet
+            )
+        st.caption(f"행성 {len(planets)}개 × {multi_steps:,}단계 케플러 궤도·밝기 계산 · {multi_seconds:.2f}초")
+
+        multi_idx = minmax_indices(multi_flux[:, None], 4000)[0]
+        st.plotly_chart(go.Figure(
+            data=go.Scatter(x=multi_times[multi_idx], y=multi_flux[multi_idx], mode='lines', name='합성 상대 밝기'),
+            layout=go.Layout(title='다중 행성계 합성 광도 곡선', xaxis_title='시간 (일)', yaxis_title='상대 밝기')
+        ), use_container_width=True)
+        st.dataframe(
+            planets[["이름"]].assign(**{k: np.asarray(v) for k, v in multi_summary.items()}),
+            use_container_width=True, hide_index=True
+        )
+
+# --- 7. 파장별 식현상 ---
+# 항성 온도로 파장별 플랑크 세기와 주연 감광을 계산해, 파장 대역마다 식현상 광도 곡선을 그립니다.
+chromatic_mode = st.sidebar.checkbox("파장별(다색) 식현상 모드", value=False)
+if chromatic_mode:
+    st.markdown("---")
+    st.header("파장별 식현상 광도 곡선")
+
+    chroma_cols = st.columns(3)
+    n_bands = chroma_cols[0].slider("파장 대역 수", min_value=20, max_value=100, value=40, step=5)
+    wavelength_range_um = chroma_cols[1].slider("파장 범위 (μm)", min_value=0.2, max_value=5.0, value=(0.3, 2.5), step=0.1)
+    band_offset = chroma_cols[2].slider("곡선 간 세로 간격", min_value=0.0, max_value=0.01, value=0.002, step=0.0005, format="%.4f")
+
+    def compute_chromatic():
+        # 1차 식현상 창(접촉점 사이)만 촘촘히 표본화합니다.
+        contacts = contact_angles(star_radius_km, planet_radius_km, distance_km)
+        if contacts is None:
+            chroma_theta = np.linspace(0, np.pi, 500)
+        else:
+            half = (contacts[3] - contacts[0]) / 2 * 1.2
+            chroma_theta = np.linspace(np.pi / 2 - half, np.pi / 2 + half, 500)
+        wavelengths_um = np.linspace(*wavelength_range_um, n_bands)
+        curves = chromatic_light_curves(
+            star_radius_km, planet_radius_km, distance_km * np.cos(chroma_theta), wavelengths_um * 1e-6, star_temperature_k
+        )
+        return chroma_theta / (2 * np.pi), wavelengths_um, curves
+
+    with trace.span("chromatic_compute", bands=n_bands):
+        chroma_time, wavelengths_um, chroma_curves = simulation_memo.get_or_compute(
+            ("chromatic", planet_radius_km, star_radius_km, distance_km, star_temperature_k, n_bands, wavelength_range_um),
+            compute_chromatic
+        )
+
+    # 파란색(짧은 파장)부터 빨간색(긴 파장)까지 색을 입혀 세로로 쌓아 그립니다.
+    band_colors = plotly.colors.sample_colorscale("Turbo", np.linspace(0, 1, n_bands))
+    fig_chromatic = go.Figure()
+    for b in range(n_bands):
+        fig_chromatic.add_trace(go.Scattergl(
+            x=chroma_time, y=chroma_curves[b] - b * band_offset, mode='lines',
+            line=dict(color=band_colors[b], width=1), name=f'{wavelengths_um[b]:.2f} μm',
+            hovertemplate=f'{wavelengths_um[b]:.2f} μm<br>' + '시간 %{x:.4f}<extra></extra>'
+        ))
+    fig_chromatic.update_layout(
+        title=f'파장별 광도 곡선 (T = {star_temperature_k:,.0f} K, 아래로 갈수록 긴 파장)',
+        xaxis_title='시간 (상대적)', yaxis_title='상대 밝기 (대역별 간격 적용)', showlegend=False, height=600
+    )
+    chroma_chart_col, chroma_depth_col = st.columns([3, 1])
+    chroma_chart_col.plotly_chart(fig_chromatic, use_container_width=True)
+    chroma_depth_col.plotly_chart(go.Figure(
+        data=go.Scatter(x=wavelengths_um, y=1 - chroma_curves.min(axis=1), mode='lines+markers'),
+        layout=go.Layout(title='파장별 식현상 깊이', xaxis_title='파장 (μm)', yaxis_title='깊이', height=600)
+    ), use_container_width=True)
+
+with st.sidebar.expander("계산 캐시 통계"):
+    memo_stats = simulation_memo.stats()
+    st.write(
+        f"적중 {memo_stats['hits']} · 미적중 {memo_stats['misses']} (적중률 {memo_stats['hit_rate']:.0%}) · "
+        f"제거 {memo_stats['evictions']}"
+    )
+    st.caption(
+        f"항목 {memo_stats['entries']}/{memo_stats['max_entries']} · "
+        f"메모리 {memo_stats['bytes'] / 1024 / 1024:,.1f} / {memo_stats['max_bytes'] / 1024 / 1024:,.0f} MB"
+    )
+
+trace.finish()
+if debug_enabled():
+    render_debug_sidebar(trace)
@@ -0,0 +1,45 @@
+"""주가 페이지를 네트워크 없이(가짜 데이터 소스, 임시 캐시) AppTest로 실행하는 스모크 테스트.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE = os.path.join(ROOT, "pages", "02_stock.py")
+
+
+@pytest.fixture
+def stock_env(tmp_path, monkeypatch):
+    # 기업이 하나뿐인 유니버스 CSV를 허용된 데이터 디렉터리에 둡니다.
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "one_universe.csv").write_text("ticker,name\nAAPL,Apple\n", encoding="utf-8")
+    monkeypatch.setenv("APP_DATA_DIR", str(data_dir))
+    monkeypatch.setenv("STOCK_DATA_PROVIDER", "fake")
+    monkeypatch.setenv("PRICE_CACHE_PATH", str(tmp_path / "prices.sqlite"))
+    monkeypatch.setenv("SHARED_PANEL_DIR", str(tmp_path / "panels"))
+    monkeypatch.setenv("PRICE_PREWARM_IN_PROCESS", "0")
+    monkeypatch.syspath_prepend(ROOT)
+    # common 모듈은 import할 때 환경 변수를 읽으므로, 위 설정으로 다시 import되게 합니다.
+    for name in [m for m in sys.modules if m == "common" or m.startswith("common.")]:
+        monkeypatch.delitem(sys.modules, name)
+    return data_dir
+
+
+def test_single_ticker_universe(stock_env):
+    # 기업이 하나면 Top-N 슬라이더를 만들 수 없으므로 건너뛰고 N=1로 그립니다.
+    at = AppTest.from_file(PAGE, default_timeout=300).run()
+    assert not at.exception
+
+    at.toggle[0].set_value(True).run()
+    assert not at.exception
+    assert [s.value for s in at.selectbox if s.label == "티커 목록 CSV"] == ["one_universe.csv"]
+    assert not [s for s in at.slider if s.label.startswith("N (")]
+
+    for view in ["Top-N 차트", "막대 경주"]:
+        at.radio(key="topn_view").set_value(view).run()
+        assert not at.exception